@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+
+from metrics import DONE_STATUS
+from time_buckets import PERIOD_COLUMN, bucket_labels
+
+# -----------------------------------------------------------------
+# 활동 건수 큐브 (Kol_ID × 월 × Status × Activity_Type)
+#   데이터 버전마다 Activities를 한 번 훑어 조밀한(dense) 건수 배열을 만들고,
+#   상태/유형 분포, 월·분기별 추이, KOL별 상태 요약은 이 배열의 작은 축 합계로 답합니다.
+#   각 축은 실제로 있는 값만 가지며, 마지막 칸은 빈 값(NA) 행을 위한 자리입니다.
+# -----------------------------------------------------------------
+CUBE_GRANULARITIES = ('month', 'quarter')  # 월 축으로 답할 수 있는 기간 단위
+
+
+def _axis(series):
+    """(코드 배열, 고유값) — 빈 값은 마지막 칸(len(고유값))으로 보냅니다."""
+    codes, uniques = pd.factorize(series, sort=True)
+    codes = codes.astype(np.int64)
+    codes[codes < 0] = len(uniques)
+    return codes, uniques
+
+
+def _frame(labels, counts, label, count_name='Count'):
+    """0건을 뺀 [label, count_name] DataFrame (많은 순)."""
+    keep = counts > 0
+    frame = pd.DataFrame({label: labels[keep].astype(str), count_name: counts[keep].astype(np.int64)})
+    return frame.sort_values(count_name, ascending=False, kind='stable').reset_index(drop=True)
+
+
+class ActivityCube:
+    """Activities의 (Kol_ID, Due_Month, Status, Activity_Type) 조합별 건수 배열과 각 축의 값."""
+
+    def __init__(self, activities_df):
+        axes = [_axis(activities_df[col]) for col in ('Kol_ID', 'Due_Month', 'Status', 'Activity_Type')]
+        shape = tuple(len(uniques) + 1 for _, uniques in axes)
+        flat = np.ravel_multi_index(tuple(codes for codes, _ in axes), shape)
+        self.counts = np.bincount(flat, minlength=int(np.prod(shape))).astype(np.int32).reshape(shape)
+
+        (_, kol_ids), (_, months), (_, statuses), (_, types) = axes
+        self.kol_ids = kol_ids
+        self.months = np.asarray(months, dtype=np.int64)
+        self.statuses = np.asarray(statuses, dtype=object)
+        self.activity_types = np.asarray(types, dtype=object)
+        self._kol_pos = {kol_id: i for i, kol_id in enumerate(kol_ids)}
+        statuses = list(self.statuses)
+        self._done = statuses.index(DONE_STATUS) if DONE_STATUS in statuses else None
+
+    @property
+    def nbytes(self):
+        return self.counts.nbytes
+
+    def status_counts(self):
+        """상태별 활동 수 [Status, Count] (많은 순)."""
+        counts = self.counts.sum(axis=(0, 1, 3))[:-1]
+        return _frame(self.statuses, counts, 'Status')
+
+    def activity_type_counts(self):
+        """활동 유형별 활동 수 [Type, Count] (많은 순)."""
+        counts = self.counts.sum(axis=(0, 1, 2))[:-1]
+        return _frame(self.activity_types, counts, 'Type')
+
+    def timeline(self, granularity='month', count_name='Count', done_only=False):
+        """월/분기별 활동 수 [Period, count_name] (기간 순, 날짜 없는 활동 제외). done_only면 완료 활동만."""
+        if done_only:
+            if self._done is None:
+                return pd.DataFrame({PERIOD_COLUMN: pd.Series(dtype=str), count_name: pd.Series(dtype=np.int64)})
+            per_month = self.counts[:, :-1, self._done, :].sum(axis=(0, 2))
+        else:
+            per_month = self.counts[:, :-1].sum(axis=(0, 2, 3))
+        keys = self.months
+        if granularity == 'quarter':
+            keys, inverse = np.unique(self.months // 3, return_inverse=True)
+            per_month = np.bincount(inverse, weights=per_month, minlength=len(keys)).astype(np.int64)
+        elif granularity != 'month':
+            raise ValueError(f"큐브는 {CUBE_GRANULARITIES} 단위만 지원합니다: {granularity}")
+        keep = per_month > 0
+        return pd.DataFrame({PERIOD_COLUMN: bucket_labels(keys[keep], granularity), count_name: per_month[keep].astype(np.int64)})
+
+    def kol_summary(self, kol_id):
+        """KOL 한 명의 (총 활동 수, 완료 수, [Status, Count] 상태 요약). 활동이 없으면 (0, 0, 빈 프레임)."""
+        pos = self._kol_pos.get(kol_id)
+        kol_counts = self.counts[pos] if pos is not None else np.zeros(self.counts.shape[1:], dtype=np.int32)
+        per_status = kol_counts.sum(axis=(0, 2))
+        done = int(per_status[self._done]) if self._done is not None else 0
+        return int(per_status.sum()), done, _frame(self.statuses, per_status[:-1], 'Status')
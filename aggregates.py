@@ -0,0 +1,60 @@
+import pandas as pd
+
+from activity_cube import CUBE_GRANULARITIES, ActivityCube
+from metrics import DONE_STATUS
+from time_buckets import DEFAULT_GRANULARITY, bucket_counts
+
+# -----------------------------------------------------------------
+# '전체' 화면(KPI + 주요 차트)에 필요한 집계를 한 번에 계산합니다.
+# 결과는 작은 DataFrame/숫자뿐이므로, 데이터 버전별로 캐시해 두고
+# 위젯 조작으로 인한 rerun에서는 원본 프레임을 다시 훑지 않고 재사용합니다.
+# 활동 건수는 Activities 행이 아니라 활동 큐브(activity_cube.py)의 축 합계로 계산합니다.
+# -----------------------------------------------------------------
+
+def _counts(series, label, count_name='Count'):
+    """value_counts 결과를 [label, count_name] 컬럼의 DataFrame으로 만듭니다 (0건 category 제외)."""
+    counts = series.value_counts()
+    counts = counts[counts > 0]
+    return pd.DataFrame({label: counts.index.astype(str), count_name: counts.to_numpy()})
+
+
+def overview_aggregates(master_df, activities_df, granularity=DEFAULT_GRANULARITY, cube=None):
+    """
+    KPI 값과 차트용 집계 프레임을 dict로 반환합니다. 타임라인은 granularity(일/주/월/분기) 단위입니다.
+    cube(ActivityCube)를 넘기면 재사용하고, 월 축으로 답할 수 없는 일/주 단위만 Activities의 날짜 키로 계산합니다.
+    """
+    if cube is None:
+        cube = ActivityCube(activities_df)
+    total_budget = master_df['Budget (USD)'].sum()
+    total_spent = master_df['Spent (USD)'].sum()
+    kpi = {
+        'kol_count': master_df.shape[0],
+        'total_budget': float(total_budget),
+        'avg_completion': float(master_df['Completion_Rate'].mean()),
+        'avg_utilization': float((total_spent / total_budget) * 100) if total_budget > 0 else 0,
+    }
+
+    if granularity in CUBE_GRANULARITIES:
+        timeline = cube.timeline(granularity)
+        completed_timeline = cube.timeline(granularity, 'Completed', done_only=True)
+    else:
+        timeline = bucket_counts(activities_df, granularity)
+        completed_timeline = bucket_counts(activities_df, granularity, 'Completed', mask=activities_df['Status'] == DONE_STATUS)
+    country_summary = master_df.groupby('Country', observed=True).agg(
+        Total_Budget=('Budget (USD)', 'sum'),
+    ).reset_index()
+    top_kols = (
+        master_df.nlargest(10, 'Completion_Rate', keep='first')[['Name', 'Completion_Rate']]
+        .reset_index(drop=True)
+    )
+
+    return {
+        'kpi': kpi,
+        'status_counts': cube.status_counts(),
+        'kol_type_counts': _counts(master_df['KOL_Type'], 'Type'),
+        'timeline': timeline,
+        'completed_timeline': completed_timeline,
+        'country_summary': country_summary,
+        'activity_type_counts': cube.activity_type_counts(),
+        'top_kols': top_kols,
+    }
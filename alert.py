@@ -1,114 +1,137 @@
-import gspread
-import pandas as pd
-from gspread_dataframe import get_as_dataframe
-from datetime import datetime, timedelta
+import functools
+from datetime import datetime
 
-# --- 설정값 ---
-SPREADSHEET_NAME = "KOL 관리 시트"
-WORKSHEET1_NAME = "KOL_Master"
-WORKSHEET2_NAME = "Activities"
-CONTRACT_ALERT_DAYS = 30  # 계약 만료 30일 전
-ACTIVITY_ALERT_DAYS = 7   # 활동 마감 7일 전
+import pandas as pd
+from alert_rules import ALERT_RULES, evaluate_rules
+from alert_state import CHANGES, alert_set, diff_alerts, make_state_store, mark_expired
+from change_probe import get_probe_stats
+from data_sources import load_dataset, source_from_env
+from gsheet_client import create_client
+from kol_data import DeltaSync
+from notifications import ALERT_CHANNEL, build_digests, make_sender, recipients_by_name, render_lines, render_messages
+from sheets_quota import get_last_load_usage
 
 # --- 1. Google Sheets 인증 및 데이터 로드 ---
 # (이 스크립트는 GitHub Actions에서 실행될 것이므로,
-# app.py와 동일하게 'google_credentials.json' 파일을 찾아서 인증합니다)
+# app.py와 동일하게 'google_credentials.json' 파일을 찾아서 인증합니다.
+# 로딩 순서(스냅샷 → 변경 프로브 → 전체 로드)는 app.py와 같은 data_sources.load_dataset을 사용하며,
+# KOL_DATA_SOURCE 환경 변수로 로컬 파일/SQLite 소스를 지정할 수도 있습니다)
 try:
-    gc = gspread.service_account(filename='google_credentials.json')
-    sh = gc.open(SPREADSHEET_NAME)
-    
-    master_df = get_as_dataframe(sh.worksheet(WORKSHEET1_NAME)).dropna(how='all')
-    activities_df = get_as_dataframe(sh.worksheet(WORKSHEET2_NAME)).dropna(how='all')
-    
-    print("✅ Google Sheets 데이터 로드 성공")
+    # 같은 실행 안에서는 인증을 한 번만 합니다.
+    get_client = functools.lru_cache(maxsize=1)(lambda: create_client(creds_path='google_credentials.json'))
+    delta_sync = DeltaSync()
+    master_df, activities_df, message = load_dataset(source_from_env(get_client), delta_sync)
+    print(message)
+    if delta_sync.memory_report is not None:
+        for sheet_name, report in delta_sync.memory_report.items():
+            total = report.loc['(합계)']
+            print(f"   - {sheet_name} 메모리: {total['Before (bytes)']:,} → {total['After (bytes)']:,} bytes")
+    probe_stats = get_probe_stats()
+    print(f"   - 변경 프로브: {probe_stats['probes']}회 중 {probe_stats['unchanged']}회 로드 생략 (적중률 {probe_stats['hit_ratio']:.0%})")
+    usage = get_last_load_usage()
+    print(f"   - API 호출 {usage['calls']}회 / 재시도 {usage['retries']}회 / 대기 {usage['throttle_wait'] + usage['backoff_wait']:.1f}초")
 
 except Exception as e:
-    print(f"❌ Google Sheets 연결 실패: {e}")
+    print(f"❌ 데이터 로드 실패: {e}")
     exit(1) # 에러 발생 시 중단
 
 
-# --- 2. 날짜 데이터 변환 ---
+# --- 2. 알림 규칙 평가 ---
+# (규칙 정의는 alert_rules.ALERT_RULES — 대시보드 3번 섹션과 같은 규칙을 씁니다.
+# 날짜 컬럼은 로드 시 schema.parse_frame에서 이미 변환되며, 날짜가 없는 행은 알림 조건에서 제외됩니다)
+today = datetime.now()
 try:
-    # 'YYYY-MM-DD' 형식을 datetime 객체로 변환
-    master_df['Contract_End_DT'] = pd.to_datetime(master_df['Contract_End'], errors='coerce')
-    activities_df['Due_Date_DT'] = pd.to_datetime(activities_df['Due_Date'], errors='coerce')
-    
-    # NaT (날짜 변환 실패)가 있는 행은 알림에서 제외
-    master_df = master_df.dropna(subset=['Contract_End_DT'])
-    activities_df = activities_df.dropna(subset=['Due_Date_DT'])
-
+    alerts = evaluate_rules(master_df, activities_df, today)
 except Exception as e:
-    print(f"❌ 날짜 변환 중 에러: {e}")
-    print("KOL_Master의 'Contract_End' 또는 Activities의 'Due_Date' 컬럼 형식을 확인하세요.")
+    print(f"❌ 알림 규칙 평가 실패: {e}")
     exit(1)
 
 
-# --- 3. 알림 조건 검색 ---
-today = datetime.now()
+# --- 3. 알림 출력 ---
+# (오늘의 알림을 알림 상태 저장소(alert_state.py)와 비교해 새 알림 / 단계 상향 / 해결 / 기한 경과 알림만 출력하고,
+# 같은 줄을 alert_lines에 모아 두었다가 4번에서 받는 사람별로 발송합니다.
+# 이미 알린 알림과 다른 규칙으로 옮겨 간 알림(예: 마감 임박 → 지연)은 건수만 표시합니다)
+CHANGE_MARKS = {'new': "", 'escalated': " ⬆️ 단계 상향", 'resolved': " ✅ 해결", 'expired': " ⌛ 기한 경과"}
+
+
+def print_lines(lines):
+    print("\n".join(lines.tolist()))
+
+
+state_store = make_state_store()
+current = pd.concat(
+    [alert_set(key, alerts[key], render_messages(alerts[key], rule['message'])) for key, rule in ALERT_RULES.items()],
+    ignore_index=True,
+)
+previous = current.iloc[:0]
+if state_store is not None:
+    try:
+        previous = state_store.load()
+    except Exception as e:
+        print(f"⚠️ 알림 상태 저장소 읽기 실패 (모든 알림을 새 알림으로 처리합니다): {e}")
+changes = mark_expired(diff_alerts(current, previous), master_df, activities_df, today)
+
 print(f"\n--- {today.strftime('%Y-%m-%d')} 기준 알림 ---")
 
-alert_found = False # 알림을 찾았는지 여부
-
-# 조건 1: 계약 만료일이 30일 이내로 다가오는 KOL
-print(f"\n🔔 [1] {CONTRACT_ALERT_DAYS}일 이내 계약 만료 건:")
-contract_alert_date = today + timedelta(days=CONTRACT_ALERT_DAYS)
-
-imminent_contracts = master_df[
-    (master_df['Contract_End_DT'] <= contract_alert_date) &
-    (master_df['Contract_End_DT'] >= today)
-]
-
-if not imminent_contracts.empty:
-    alert_found = True
-    for index, row in imminent_contracts.iterrows():
-        d_day = (row['Contract_End_DT'] - today).days
-        print(f"  - [D-{d_day}] {row['Name']} ({row['Country']}) - 계약 만료: {row['Contract_End']}")
-else:
-    print("  (해당 없음)")
-
-
-# 조건 2: 마감일이 7일 이내로 다가오는 'Planned' 상태의 활동
-print(f"\n🔔 [2] {ACTIVITY_ALERT_DAYS}일 이내 마감 활동 (Planned):")
-activity_alert_date = today + timedelta(days=ACTIVITY_ALERT_DAYS)
-
-imminent_activities = activities_df[
-    (activities_df['Due_Date_DT'] <= activity_alert_date) &
-    (activities_df['Due_Date_DT'] >= today) &
-    (activities_df['Status'] == 'Planned')
-]
-
-if not imminent_activities.empty:
-    alert_found = True
-    # 가독성을 위해 master_df에서 이름(Name)을 찾아 합칩니다.
-    imminent_activities = pd.merge(imminent_activities, master_df[['Kol_ID', 'Name']], on='Kol_ID', how='left')
-    for index, row in imminent_activities.iterrows():
-        d_day = (row['Due_Date_DT'] - today).days
-        print(f"  - [D-{d_day}] {row['Name']} - 활동 마감: {row['Activity_Type']} ({row['Due_Date']})")
-else:
-    print("  (해당 없음)")
-
-
-# 조건 3: 마감일이 지났지만 'Done'이 아닌 활동 (지연됨)
-print(f"\n🔔 [3] 마감일이 지난 활동 (Delayed/Planned):")
-overdue_activities = activities_df[
-    (activities_df['Due_Date_DT'] < today) &
-    (activities_df['Status'] != 'Done') # 'Done'이 아닌 모든 것
-]
-
-if not overdue_activities.empty:
-    alert_found = True
-    overdue_activities = pd.merge(overdue_activities, master_df[['Kol_ID', 'Name']], on='Kol_ID', how='left')
-    for index, row in overdue_activities.iterrows():
-        overdue_days = (today - row['Due_Date_DT']).days
-        print(f"  - [D+{overdue_days}] {row['Name']} - 활동 지연: {row['Activity_Type']} (마감: {row['Due_Date']}, 상태: {row['Status']})")
-else:
-    print("  (해당 없음)")
+alert_found = not current.empty # 알림을 찾았는지 여부
+alert_lines = []
+
+for number, (key, rule) in enumerate(ALERT_RULES.items(), start=1):
+    section = f"🔔 [{number}] {rule['title']}:"
+    print(f"\n{section}")
+    rule_changes = changes[changes['Rule'] == key]
+
+    if not rule_changes.empty:
+        changed = rule_changes[rule_changes['Change'].isin(CHANGES)]
+        if not changed.empty:
+            lines = changed['Line'] + changed['Change'].map(CHANGE_MARKS)
+            print_lines(lines)
+            alert_lines.append(render_lines(section, changed, lines))
+        ongoing = int((rule_changes['Change'] == 'ongoing').sum())
+        if ongoing:
+            print(f"  (이미 알린 {ongoing}건 생략)")
+        moved = int((rule_changes['Change'] == 'moved').sum())
+        if moved:
+            print(f"  (다른 알림으로 이동 {moved}건)")
+    else:
+        print("  (해당 없음)")
 
 
 print("\n--- 알림 검색 완료 ---")
+counts = changes['Change'].value_counts()
+print(f"새 알림 {counts.get('new', 0)}건 / 단계 상향 {counts.get('escalated', 0)}건 / 해결 {counts.get('resolved', 0)}건 / "
+      f"기한 경과 {counts.get('expired', 0)}건 / 이동 {counts.get('moved', 0)}건 / 이미 알림 {counts.get('ongoing', 0)}건")
 
 if not alert_found:
     print("🎉 모든 일정이 정상입니다.")
 
-# (추후 이 스크립트에 smtplib (이메일) 또는 requests (슬랙) 코드를 추가하여
-# 이 print() 결과 대신 실제 알림을 발송하게 됩니다.)
\ No newline at end of file
+
+# --- 4. 알림 발송 ---
+# (KOL_ALERT_CHANNEL=smtp 또는 webhook 일 때 받는 사람별 요약 한 통씩 발송합니다. 기본값 print는 위 출력만 합니다.
+# 담당자는 KOL_ALERT_RECIPIENT_COLUMN 컬럼, 없으면 KOL_ALERT_TO 주소로 보냅니다. 설정은 notifications.py 참고)
+if alert_lines and ALERT_CHANNEL != 'print':
+    try:
+        sender = make_sender(ALERT_CHANNEL)
+        all_lines = pd.concat(alert_lines, ignore_index=True)
+        digests = build_digests(all_lines, recipients_by_name(master_df))
+        if digests.empty:
+            print("\n⚠️ 알림을 받을 주소가 없습니다 (KOL_ALERT_TO / KOL_ALERT_RECIPIENT_COLUMN 확인).")
+        else:
+            subject = f"[KOL 알림] {today.strftime('%Y-%m-%d')} ({len(all_lines)}건)"
+            stats = sender.send_all(digests, subject)
+            print(f"\n📨 알림 발송 ({ALERT_CHANNEL}): {stats['sent']}명 성공 / {stats['failed']}명 실패")
+            if stats['failed']:
+                exit(1)
+    except Exception as e:
+        print(f"❌ 알림 발송 실패: {e}")
+        exit(1)
+
+
+# --- 5. 알림 상태 저장 ---
+# (발송까지 끝난 뒤에 저장하므로, 발송이 실패한 알림은 다음 실행에서 다시 새 알림으로 보냅니다)
+if state_store is not None:
+    try:
+        state_store.save(changes, today)
+        print(f"\n💾 알림 상태 저장: 진행 중인 알림 {len(current)}건")
+    except Exception as e:
+        print(f"⚠️ 알림 상태 저장 실패: {e}")
@@ -0,0 +1,246 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from metrics import DONE_STATUS
+
+# -----------------------------------------------------------------
+# 알림 규칙 (대시보드 3번 섹션, 원본 표 강조, alert.py 공용)
+#   규칙은 스키마(schema.py)와 같이 dict로 선언합니다.
+#     table        : 'master' 또는 'activities'
+#     date         : 기준 날짜 컬럼
+#     window       : 오늘 기준 일수 구간 (시작, 끝). None은 제한 없음
+#     closed       : 구간 끝 포함 여부 ('both', 'left', 'right', 'neither' — pd.Interval과 같음)
+#     status_in / status_not_in : Status 조건 (빈 Status는 status_not_in만 통과)
+#     except_rule  : 같은 테이블의 다른 규칙 이름. 그 규칙에 걸리는 행은 제외합니다 (두 규칙이 겹치지 않게)
+#     key          : 알림 대상을 구분하는 ID 컬럼 (결과의 첫 컬럼, 알림 상태 저장소의 키)
+#     columns      : 결과 컬럼 (activities 규칙의 Name은 Kol_ID로 KOL_Master에서 붙입니다)
+#     days_column  : 일수 컬럼 이름, days: 'until'(남은 일수) 또는 'since'(지난 일수)
+#     tiers        : 알림 단계 (D-N의 N). 각 행은 남은 일수가 들어가는 가장 좁은 단계(Tier)로 분류됩니다
+#     title / message : 알림 제목과 메시지 줄 템플릿 (notifications.render_messages)
+#   날짜는 일 단위로 비교합니다 (오늘 = 자정 기준, 원본 표 강조와 같은 기준).
+# -----------------------------------------------------------------
+CONTRACT_ALERT_TIERS = (30, 14, 7, 1)  # 계약 만료 D-30, D-14, D-7, D-1
+ACTIVITY_ALERT_TIERS = (7, 3, 1)       # 활동 마감 D-7, D-3, D-1
+
+# KOL_Type별 알림 단계 {KOL_Type: {규칙 이름: 단계}} — 없는 KOL_Type/규칙은 위 기본 단계를 씁니다.
+# KOL_ALERT_TIERS 환경 변수(JSON)로 지정합니다. 예: {"Global": {"contract_expiry": [60, 30, 14, 7, 1]}}
+ALERT_TIERS_BY_KOL_TYPE = json.loads(os.environ.get('KOL_ALERT_TIERS', '{}'))
+
+
+def _widest_tier(rule_name, default_tiers):
+    """기본 단계와 KOL_Type별 단계 중 가장 긴 일수 (규칙의 조회 구간 끝)."""
+    overrides = [max(tiers[rule_name]) for tiers in ALERT_TIERS_BY_KOL_TYPE.values() if tiers.get(rule_name)]
+    return max([max(default_tiers)] + overrides)
+
+
+CONTRACT_ALERT_DAYS = _widest_tier('contract_expiry', CONTRACT_ALERT_TIERS)
+ACTIVITY_ALERT_DAYS = _widest_tier('activity_due', ACTIVITY_ALERT_TIERS)
+
+ALERT_RULES = {
+    'contract_expiry': {
+        'table': 'master', 'date': 'Contract_End', 'key': 'Kol_ID',
+        'window': (0, CONTRACT_ALERT_DAYS), 'closed': 'both', 'tiers': CONTRACT_ALERT_TIERS,
+        'columns': ['Name', 'Country', 'Contract_End'], 'days_column': 'D-Day', 'days': 'until',
+        'title': f"{CONTRACT_ALERT_DAYS}일 이내 계약 만료 건",
+        'message': "  - [D-{D-Day}] {Name} ({Country}) - 계약 만료: {Contract_End} (D-{Tier} 알림)",
+    },
+    'activity_due': {
+        'table': 'activities', 'date': 'Due_Date', 'key': 'Activity_ID',
+        'window': (0, ACTIVITY_ALERT_DAYS), 'closed': 'both', 'status_in': ['Planned'], 'tiers': ACTIVITY_ALERT_TIERS,
+        'columns': ['Name', 'Activity_Type', 'Due_Date'], 'days_column': 'D-Day', 'days': 'until',
+        'title': f"{ACTIVITY_ALERT_DAYS}일 이내 마감 활동 (Planned)",
+        'message': "  - [D-{D-Day}] {Name} - 활동 마감: {Activity_Type} ({Due_Date}) (D-{Tier} 알림)",
+    },
+    'activity_overdue': {
+        'table': 'activities', 'date': 'Due_Date', 'key': 'Activity_ID',
+        # 오늘 마감인 활동도 포함하되, Planned는 activity_due(D-0)로만 알립니다. (Delayed 등은 여기서 D+0)
+        'window': (None, 0), 'closed': 'both', 'status_not_in': [DONE_STATUS], 'except_rule': 'activity_due',
+        'columns': ['Name', 'Activity_Type', 'Due_Date', 'Status'], 'days_column': 'Overdue (Days)', 'days': 'since',
+        'title': "마감일이 지난 활동 (Delayed/Planned)",
+        'message': "  - [D+{Overdue (Days)}] {Name} - 활동 지연: {Activity_Type} (마감: {Due_Date}, 상태: {Status})",
+    },
+}
+
+
+def day_offsets(dates, today):
+    """dates가 today(일 단위)로부터 며칠 뒤인지 (지난 날짜는 음수, 빈 날짜는 NaN, float 배열)."""
+    today_day = pd.Timestamp(today).to_datetime64().astype('datetime64[D]').astype(np.int64)
+    values = dates.to_numpy(dtype='datetime64[ns]')
+    offsets = (values.astype('datetime64[D]').astype(np.int64) - today_day).astype(np.float64)
+    offsets[np.isnat(values)] = np.nan
+    return offsets
+
+
+def _window_mask(offsets, rule):
+    start, end = rule['window']
+    closed = rule.get('closed', 'both')
+    mask = ~np.isnan(offsets)
+    if start is not None:
+        mask &= offsets >= start if closed in ('both', 'left') else offsets > start
+    if end is not None:
+        mask &= offsets <= end if closed in ('both', 'right') else offsets < end
+    return mask
+
+
+def _status_mask(df, rule):
+    mask = np.ones(len(df), dtype=bool)
+    if 'status_in' in rule:
+        mask &= df['Status'].isin(rule['status_in']).to_numpy()
+    if 'status_not_in' in rule:
+        mask &= ~df['Status'].isin(rule['status_not_in']).to_numpy()
+    return mask
+
+
+def assign_tiers(days, kol_types, default_tiers, tiers_by_type):
+    """
+    남은 일수(days)마다 가장 좁은 알림 단계 (단계 밖이면 -1, int64 배열).
+    KOL_Type별 단계를 겹치지 않는 구간으로 이어 붙인 키 배열에 searchsorted 한 번으로 분류합니다.
+    """
+    days = np.asarray(days, dtype=np.int64)
+    types = list(tiers_by_type)
+    blocks = [np.sort(np.asarray(default_tiers, dtype=np.int64))]
+    blocks += [np.sort(np.asarray(tiers_by_type[t], dtype=np.int64)) for t in types]
+    stride = int(max(block.max() for block in blocks)) + 1
+    codes = pd.Index(types, dtype=object).get_indexer(np.asarray(kol_types, dtype=object)) + 1 if types else np.zeros(len(days), dtype=np.int64)
+    keys = np.concatenate([code * stride + block for code, block in enumerate(blocks)])
+    block_ends = np.cumsum([len(block) for block in blocks])
+
+    found = np.searchsorted(keys, codes * stride + days, side='left')
+    inside = (found < block_ends[codes]) & (days >= 0)
+    return np.where(inside, keys[np.minimum(found, len(keys) - 1)] - codes * stride, -1)
+
+
+def rule_tiers(rule_name):
+    """{KOL_Type: 단계} — rule_name 규칙에 KOL_Type별 단계를 지정한 것만."""
+    return {kol_type: tiers[rule_name] for kol_type, tiers in ALERT_TIERS_BY_KOL_TYPE.items() if tiers.get(rule_name)}
+
+
+def rule_mask(df, rule, today, rules=ALERT_RULES):
+    """df에서 rule 조건을 만족하는 행 (bool 배열). 표의 한 페이지처럼 작은 프레임용 (전체 데이터는 AlertIndex)."""
+    mask = _window_mask(day_offsets(df[rule['date']], today), rule) & _status_mask(df, rule)
+    if 'except_rule' in rule and mask.any():
+        mask &= ~rule_mask(df, rules[rule['except_rule']], today, rules)
+    return mask
+
+
+def alert_mask(df, rule_name, today, rules=ALERT_RULES):
+    """
+    df에서 rule_name 규칙의 알림이 되는 행 (bool 배열, evaluate_rules와 같은 행).
+    rule_mask에 더해 단계(tiers)가 있는 규칙은 KOL_Type별 단계 밖의 행을 제외합니다 (df에 KOL_Type이 없으면 기본 단계).
+    """
+    rule = rules[rule_name]
+    offsets = day_offsets(df[rule['date']], today)
+    mask = rule_mask(df, rule, today, rules)
+    if 'tiers' in rule and mask.any():
+        kol_types = df['KOL_Type'] if 'KOL_Type' in df.columns else pd.Series(np.nan, index=df.index)
+        tiers = assign_tiers(np.where(mask, offsets, -1), kol_types.astype(object), rule['tiers'], rule_tiers(rule_name))
+        mask &= tiers >= 0
+    return mask
+
+
+# -----------------------------------------------------------------
+# 정렬 인덱스: 데이터 버전별로 한 번 만들고, 규칙의 날짜 구간은 이진 탐색으로 잘라냅니다.
+#   (테이블, 날짜 컬럼)마다 날짜가 있는 행을 (Status, 날짜, 원래 위치) 순으로 정렬해 두므로
+#   규칙 하나의 비용은 O(상태 수 × log n + 결과 행 수)이고, 지난 이력이 쌓여도 늘지 않습니다.
+#   Status 조건이 없는 (테이블, 날짜 컬럼)은 Status로 나누지 않습니다.
+# -----------------------------------------------------------------
+
+class AlertIndex:
+    """규칙 평가용 정렬 인덱스. buckets[(table, date)] = {Status(빈 값은 None): (정렬된 일 번호, 행 위치)}"""
+
+    def __init__(self, master_df, activities_df, rules=ALERT_RULES):
+        self.tables = {'master': master_df, 'activities': activities_df}
+        self.rules = rules
+        by_status = {}
+        for rule in rules.values():
+            key = (rule['table'], rule['date'])
+            by_status[key] = by_status.get(key, False) or 'status_in' in rule or 'status_not_in' in rule
+        self.buckets = {key: self._build(self.tables[key[0]], key[1], split) for key, split in by_status.items()}
+        # activities 규칙의 Name / KOL_Type 조회용
+        kols = master_df.drop_duplicates('Kol_ID').set_index('Kol_ID')
+        self.names = kols['Name']
+        self.kol_types = kols['KOL_Type'] if 'KOL_Type' in kols.columns else pd.Series(dtype=object)
+
+    @staticmethod
+    def _build(df, date_column, by_status):
+        values = df[date_column].to_numpy(dtype='datetime64[ns]')
+        positions = np.flatnonzero(~np.isnat(values))
+        days = values[positions].astype('datetime64[D]').astype(np.int64)
+        if not by_status:
+            order = np.argsort(days, kind='stable')
+            return {None: (days[order], positions[order])}
+        codes, statuses = pd.factorize(df['Status'])
+        codes = codes[positions]
+        order = np.lexsort((days, codes))
+        codes, days, positions = codes[order], days[order], positions[order]
+        bounds = np.searchsorted(codes, np.arange(-1, len(statuses) + 1))  # 코드 -1(빈 Status)부터
+        keys = [None] + list(statuses)
+        return {key: (days[bounds[i]:bounds[i + 1]], positions[bounds[i]:bounds[i + 1]]) for i, key in enumerate(keys)}
+
+    def query(self, rule, today):
+        """rule에 맞는 행의 (행 위치, 오늘부터의 일수) — 날짜 순 (같은 날짜는 원래 행 순서)."""
+        today_day = pd.Timestamp(today).to_datetime64().astype('datetime64[D]').astype(np.int64)
+        start, end = rule['window']
+        closed = rule.get('closed', 'both')
+        buckets = self.buckets[(rule['table'], rule['date'])]
+        keys = list(buckets)
+        if 'status_in' in rule:
+            keys = [key for key in keys if key is not None and key in rule['status_in']]
+        if 'status_not_in' in rule:
+            keys = [key for key in keys if key is None or key not in rule['status_not_in']]
+
+        day_parts, position_parts = [], []
+        for key in keys:
+            days, positions = buckets[key]
+            lo = 0 if start is None else np.searchsorted(
+                days, today_day + start, side='left' if closed in ('both', 'left') else 'right')
+            hi = len(days) if end is None else np.searchsorted(
+                days, today_day + end, side='right' if closed in ('both', 'right') else 'left')
+            day_parts.append(days[lo:hi])
+            position_parts.append(positions[lo:hi])
+        days = np.concatenate(day_parts) if day_parts else np.empty(0, dtype=np.int64)
+        positions = np.concatenate(position_parts) if position_parts else np.empty(0, dtype=np.int64)
+        if len(day_parts) > 1:
+            order = np.lexsort((positions, days))
+            days, positions = days[order], positions[order]
+        if 'except_rule' in rule and len(positions):
+            keep = ~np.isin(positions, self.query(self.rules[rule['except_rule']], today)[0])
+            days, positions = days[keep], positions[keep]
+        return positions, days - today_day
+
+
+def evaluate_rules(master_df, activities_df, today, rules=ALERT_RULES, index=None):
+    """
+    모든 규칙의 결과 프레임을 {규칙 이름: DataFrame}으로 반환합니다 (행은 날짜 순, 첫 컬럼은 규칙의 key).
+    단계(tiers)가 있는 규칙은 Tier 컬럼을 붙이고, KOL_Type의 단계 밖에 있는 행은 제외합니다.
+    index(AlertIndex)를 넘기면 재사용하고, 없으면 이번 호출에서 만듭니다.
+    """
+    if index is None:
+        index = AlertIndex(master_df, activities_df, rules)
+    results = {}
+    for key, rule in rules.items():
+        df = index.tables[rule['table']]
+        positions, offsets = index.query(rule, today)
+
+        columns = [rule['key']] + [c for c in rule['columns'] if c in df.columns]
+        columns += ['Kol_ID'] if 'Name' not in df.columns else []
+        columns += ['KOL_Type'] if 'tiers' in rule and 'KOL_Type' in df.columns else []
+        columns = list(dict.fromkeys(columns))
+        rows = df.iloc[positions, df.columns.get_indexer(columns)].reset_index(drop=True)  # 결과 행만 복사
+        if 'Name' not in df.columns:
+            rows['Name'] = rows['Kol_ID'].map(index.names).to_numpy()
+            if 'tiers' in rule:
+                rows['KOL_Type'] = rows['Kol_ID'].map(index.kol_types).to_numpy()
+        rows[rule['days_column']] = offsets if rule['days'] == 'until' else -offsets
+        output = [rule['key']] + rule['columns'] + [rule['days_column']]
+
+        if 'tiers' in rule:
+            kol_types = rows['KOL_Type'] if 'KOL_Type' in rows.columns else pd.Series(np.nan, index=rows.index)
+            rows['Tier'] = assign_tiers(offsets, kol_types.astype(object), rule['tiers'], rule_tiers(key))
+            rows = rows[rows['Tier'] >= 0].reset_index(drop=True)
+            output.append('Tier')
+        results[key] = rows[output]
+    return results
@@ -0,0 +1,148 @@
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from alert_rules import ALERT_RULES, rule_mask
+from snapshot import SNAPSHOT_DIR
+
+# -----------------------------------------------------------------
+# 알림 상태 저장소 (alert.py)
+#   지난 실행에서 알린 알림을 (규칙, 대상 ID)별로 SQLite에 보관하고,
+#   오늘의 알림과 병합(merge)해서 바뀐 것만 알립니다.
+#     new       : 처음 나타난 알림
+#     escalated : 알림 단계(Tier)가 더 좁아진 알림 (예: D-14 → D-7)
+#     resolved  : 지난번에는 있었는데 오늘은 어느 규칙에도 없는 알림 (완료, 기한 변경 등)
+#     expired   : 날짜가 지나서 규칙 구간을 벗어난 알림 (예: 계약 종료) — mark_expired
+#     moved     : 같은 대상이 오늘은 다른 규칙에 있는 알림 (예: 마감 임박 → 지연, 발송하지 않음)
+#     ongoing   : 이미 알린 그대로의 알림 (발송하지 않음)
+#   저장 위치는 기본적으로 스냅샷 디렉터리이므로 GitHub Actions 캐시로 다음 실행에 이어집니다.
+#   KOL_ALERT_STATE_PATH를 빈 값으로 두면 저장소 없이 매번 모든 알림을 보냅니다.
+# -----------------------------------------------------------------
+ALERT_STATE_PATH = os.environ.get('KOL_ALERT_STATE_PATH', os.path.join(SNAPSHOT_DIR, 'alert_state.sqlite'))
+
+STATE_COLUMNS = ['Rule', 'Key', 'Name', 'Tier', 'Line', 'First_Seen']
+CHANGES = ('new', 'escalated', 'resolved', 'expired')  # 발송 대상 (ongoing, moved 제외)
+DEPARTED = ('resolved', 'expired', 'moved')  # 오늘의 알림에 없는 행 (저장하지 않음)
+
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS alert_state (
+        rule TEXT NOT NULL,
+        key TEXT NOT NULL,
+        name TEXT,
+        tier INTEGER,
+        line TEXT NOT NULL,
+        first_seen TEXT NOT NULL,
+        PRIMARY KEY (rule, key)
+    )
+"""
+
+
+def alert_set(rule, rows, lines):
+    """규칙 하나의 결과(rows, 첫 컬럼이 대상 ID)와 메시지 줄을 [Rule, Key, Name, Tier, Line, First_Seen] 프레임으로 만듭니다."""
+    tiers = rows['Tier'] if 'Tier' in rows.columns else pd.Series(pd.NA, index=rows.index)
+    return pd.DataFrame({
+        'Rule': rule,
+        'Key': rows.iloc[:, 0].astype(str).to_numpy(dtype=object),
+        'Name': rows['Name'].to_numpy(dtype=object),
+        'Tier': tiers.astype('Int64').array,
+        'Line': lines.to_numpy(dtype=object),
+        'First_Seen': None,
+    }, columns=STATE_COLUMNS)
+
+
+def diff_alerts(current, previous, rules=ALERT_RULES):
+    """
+    오늘의 알림(current)과 저장된 알림(previous)을 (Rule, Key)로 병합해 Change 컬럼을 붙입니다.
+    빠진 알림은 같은 대상(규칙의 key 컬럼과 Key)이 오늘 다른 규칙에 있으면 moved, 없으면 resolved입니다.
+    current 행이 원래 순서대로 앞에, 빠진 행이 그 뒤에 옵니다. 빠진 행의 Name/Tier/Line은 저장된 값입니다.
+    """
+    # outer merge는 키 순서로 정렬하므로, 원래 순서를 컬럼으로 들고 가서 되돌립니다.
+    merged = current.drop(columns='First_Seen').assign(Order=np.arange(len(current))).merge(
+        previous[STATE_COLUMNS].assign(Order=np.arange(len(previous))),
+        on=['Rule', 'Key'], how='outer', suffixes=('', '_prev'), indicator=True,
+    ).sort_values(['Order', 'Order_prev'], kind='stable')
+    resolved = (merged['_merge'] == 'right_only').to_numpy()
+    key_columns = {name: rule['key'] for name, rule in rules.items()}
+    targets = pd.MultiIndex.from_arrays([current['Rule'].map(key_columns), current['Key']])
+    moved = resolved & pd.MultiIndex.from_arrays([merged['Rule'].map(key_columns), merged['Key']]).isin(targets)
+    tightened = (merged['Tier'] < merged['Tier_prev']).fillna(False).to_numpy(dtype=bool)
+    merged['Change'] = 'ongoing'
+    merged.loc[(merged['_merge'] == 'left_only').to_numpy(), 'Change'] = 'new'
+    merged.loc[(merged['_merge'] == 'both').to_numpy() & tightened, 'Change'] = 'escalated'
+    merged.loc[resolved, 'Change'] = 'resolved'
+    merged.loc[moved, 'Change'] = 'moved'
+    for col in ('Name', 'Tier', 'Line'):
+        merged[col] = merged[col].where(~resolved, merged[f'{col}_prev'])
+    merged = pd.concat([merged[~resolved], merged[resolved]])
+    return merged[STATE_COLUMNS + ['Change']].reset_index(drop=True)
+
+
+def mark_expired(changes, master_df, activities_df, today, rules=ALERT_RULES):
+    """
+    resolved 행 중 대상의 날짜가 오늘 규칙 구간의 시작보다 앞이고 Status 조건은 그대로인 행을 expired로 바꿉니다.
+    (예: 만료일이 지난 계약. 완료 처리했거나 날짜를 뒤로 미룬 경우는 resolved로 남습니다)
+    """
+    tables = {'master': master_df, 'activities': activities_df}
+    changes = changes.copy()
+    for name, rule in rules.items():
+        start = rule['window'][0]
+        resolved = ((changes['Rule'] == name) & (changes['Change'] == 'resolved')).to_numpy()
+        if start is None or not resolved.any():
+            continue
+        df = tables[rule['table']].drop_duplicates(rule['key'])
+        targets = df.set_axis(df[rule['key']].astype(str)).reindex(changes.loc[resolved, 'Key'])
+        # 구간 시작 전 (시작일이 구간에 포함되면 시작일 전날까지, 아니면 시작일까지)
+        before = dict(rule, window=(None, start), closed='left' if rule.get('closed', 'both') in ('both', 'left') else 'both')
+        expired = np.flatnonzero(resolved)[rule_mask(targets, before, today, rules)]
+        changes.iloc[expired, changes.columns.get_loc('Change')] = 'expired'
+    return changes
+
+
+class AlertStateStore:
+    """(rule, key)를 기본 키로 하는 SQLite 테이블 하나. 저장은 트랜잭션 하나로 전체를 교체합니다."""
+
+    def __init__(self, path=ALERT_STATE_PATH):
+        self.path = path
+
+    def _connect(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        conn = sqlite3.connect(self.path)
+        conn.execute(_SCHEMA)
+        return conn
+
+    def load(self):
+        """저장된 알림 [Rule, Key, Name, Tier, Line, First_Seen]. 저장소가 없으면 빈 프레임."""
+        if not os.path.exists(self.path):
+            return pd.DataFrame({col: pd.Series(dtype='Int64' if col == 'Tier' else object) for col in STATE_COLUMNS})
+        conn = self._connect()
+        try:
+            state = pd.read_sql_query("SELECT rule, key, name, tier, line, first_seen FROM alert_state", conn)
+        finally:
+            conn.close()
+        state.columns = STATE_COLUMNS
+        return state.astype({col: 'Int64' if col == 'Tier' else object for col in STATE_COLUMNS})
+
+    def save(self, diff, today):
+        """diff_alerts 결과에서 빠진 알림(DEPARTED)을 뺀 알림을 저장합니다. 처음 본 날짜는 유지하고, 새 알림은 today입니다."""
+        active = diff[~diff['Change'].isin(DEPARTED)]
+        first_seen = active['First_Seen'].where(active['First_Seen'].notna(), pd.Timestamp(today).strftime('%Y-%m-%d'))
+        rows = list(zip(
+            active['Rule'], active['Key'],
+            [None if pd.isna(name) else str(name) for name in active['Name']],
+            [None if pd.isna(tier) else int(tier) for tier in active['Tier']],
+            active['Line'], first_seen,
+        ))
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("DELETE FROM alert_state")
+                conn.executemany("INSERT INTO alert_state VALUES (?, ?, ?, ?, ?, ?)", rows)
+        finally:
+            conn.close()
+
+
+def make_state_store(path=ALERT_STATE_PATH):
+    """알림 상태 저장소. path가 비어 있으면 None (모든 알림을 매번 보냄)."""
+    return AlertStateStore(path) if path else None
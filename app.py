@@ -1,11 +1,25 @@
 import streamlit as st
-import gspread
 import pandas as pd
-from gspread_dataframe import get_as_dataframe
 import os
+import functools
+import time
 import altair as alt
 alt.themes.enable('streamlit') # <-- 이 줄을 추가하세요
-from datetime import datetime, timedelta 
+from datetime import datetime
+from alert_rules import CONTRACT_ALERT_DAYS, AlertIndex, evaluate_rules
+from background_refresh import BackgroundDataset
+from gsheet_client import create_client, get_auth_stats
+from change_probe import get_probe_stats
+from data_sources import LOAD_FLIGHTS, load_dataset, source_from_env
+from kol_data import COMPACT_FRAMES, DeltaSync, get_data_version
+from kol_index import KolIndex
+from query_engine import QUERY_ENGINE, make_engine
+from schema import frame_memory
+from sheets_quota import get_last_load_usage
+from snapshot import read_snapshot
+from styling import highlight_activity_rows, highlight_master_rows
+from table_view import page_count, page_rows, table_positions
+from time_buckets import DEFAULT_GRANULARITY, GRANULARITIES, PERIOD_COLUMN
 
 # -----------------------------------------------------------------
 # 0. 전역 변수 선언 및 유틸리티 함수
@@ -13,6 +27,15 @@ from datetime import datetime, timedelta
 master_df = None
 activities_df = None
 
+DATA_TTL_SECONDS = 60
+# True: 마지막 데이터를 즉시 보여주고 백그라운드에서 갱신 (stale-while-revalidate)
+# False: TTL 만료 시 해당 rerun에서 직접 다시 로드 (st.cache_data)
+STALE_WHILE_REVALIDATE = os.environ.get('KOL_STALE_WHILE_REVALIDATE', '1') == '1'
+# 관리자용 메모리 리포트 표시 여부. 켜도 사이드바 토글을 켠 세션에서만 계산합니다.
+MEMORY_REPORT = os.environ.get('KOL_MEMORY_REPORT', '0') == '1'
+# 원본 데이터 표의 페이지 크기 선택지 (화면에는 한 페이지만 서식 적용 후 전송합니다)
+PAGE_SIZES = [25, 50, 100, 500]
+
 def get_max_value(df, column, is_percentage=False):
     """주어진 컬럼의 최대값보다 10% 더 큰 값을 계산합니다."""
     if df.empty or column not in df.columns:
@@ -32,83 +55,147 @@ def get_max_value(df, column, is_percentage=False):
 # 1. Google Sheets 인증 및 데이터 로드 (이전과 동일)
 # -----------------------------------------------------------------
 
-@st.cache_data(ttl=60) 
-def load_data_from_gsheet():
-    
-    SPREADSHEET_NAME = "KOL 관리 시트" 
-    WORKSHEET1_NAME = "KOL_Master"
-    WORKSHEET2_NAME = "Activities"
+@st.cache_resource(validate=lambda gc: gc is not None)
+def get_gspread_client():
+    """인증된 gspread 클라이언트를 프로세스 전체에서 재사용합니다. (인증 정보가 없으면 None)"""
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    creds_path = os.path.join(script_dir, 'google_credentials.json')
     
-    try:
-        # --- 인증 로직 ---
-        gc = None
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        creds_path = os.path.join(script_dir, 'google_credentials.json')
-        
-        if os.path.exists(creds_path):
-            gc = gspread.service_account(filename=creds_path)
-        elif 'gcp_service_account' in st.secrets:
-            creds_dict = st.secrets['gcp_service_account']
-            gc = gspread.service_account_from_dict(creds_dict)
-        else:
-            st.error("인증 실패: 'google_credentials.json' 파일을 찾거나 Streamlit 'Secrets' 설정을 확인하세요.")
-            return None, None
-
-        # --- 데이터 로드 ---
-        sh = gc.open(SPREADSHEET_NAME)
-        master_df = get_as_dataframe(sh.worksheet(WORKSHEET1_NAME)).dropna(how='all') 
-        activities_df = get_as_dataframe(sh.worksheet(WORKSHEET2_NAME)).dropna(how='all')
-        
-        # --- 데이터 타입 변환 및 계산 ---
-        master_df['Contract_End'] = pd.to_datetime(master_df['Contract_End'], errors='coerce')
-        activities_df['Due_Date'] = pd.to_datetime(activities_df['Due_Date'], errors='coerce')
-        master_df['Budget (USD)'] = pd.to_numeric(master_df['Budget (USD)'], errors='coerce').fillna(0)
-        master_df['Spent (USD)'] = pd.to_numeric(master_df['Spent (USD)'], errors='coerce').fillna(0)
-        
-        activities_df['Done'] = activities_df['Status'].apply(lambda x: 1 if x == 'Done' else 0)
-        activity_summary = activities_df.groupby('Kol_ID').agg(Total=('Activity_ID', 'count'), Done=('Done', 'sum')).reset_index()
-        activity_summary['Completion_Rate'] = (activity_summary['Done'] / activity_summary['Total']) * 100
-        master_df = pd.merge(master_df, activity_summary[['Kol_ID', 'Completion_Rate']], on='Kol_ID', how='left').fillna({'Completion_Rate': 0})
-        master_df['Utilization_Rate'] = (master_df['Spent (USD)'] / master_df['Budget (USD)']) * 100
-        master_df['Utilization_Rate'] = master_df['Utilization_Rate'].fillna(0).apply(lambda x: min(x, 100))
-        
-        activities_df['YearMonth'] = activities_df['Due_Date'].dt.to_period('M').astype(str)
+    if os.path.exists(creds_path):
+        return create_client(creds_path=creds_path)
+    elif 'gcp_service_account' in st.secrets:
+        return create_client(creds_info=st.secrets['gcp_service_account'])
+    return None
+
+
+@st.cache_resource
+def get_delta_sync():
+    """세션/캐시 만료와 무관하게 프로세스 전체에서 공유되는 증분 동기화 상태."""
+    return DeltaSync()
+
 
-        st.success("🎉 데이터 로드 및 초기 계산 완료!")
+@st.cache_resource
+def get_data_source():
+    """KOL_DATA_SOURCE 설정(기본값: Google Sheets)에 맞는 데이터 소스."""
+    return source_from_env(get_gspread_client)
+
+
+@st.cache_data(ttl=DATA_TTL_SECONDS) 
+def load_data_from_gsheet():
+    """(기본 캐시 모드) TTL이 만료되면 이번 rerun에서 데이터를 다시 가져옵니다."""
+    try:
+        master_df, activities_df, message = load_dataset(get_data_source(), get_delta_sync())
+        st.success(message)
         return master_df, activities_df
 
     except Exception as e:
         st.error(f"데이터 로드 중 에러 발생: {e}")
         return None, None
 
+
+@st.cache_resource
+def get_background_dataset():
+    """(stale-while-revalidate 모드) 프로세스 전체가 공유하는 백그라운드 갱신 데이터셋."""
+    source = get_data_source()
+    loader = functools.partial(load_dataset, source, get_delta_sync())
+
+    # 재배포 직후에는 오래된 스냅샷이라도 먼저 보여주고, 곧바로 백그라운드에서 갱신합니다.
+    initial = None
+    snapshot = read_snapshot(max_age=None, snapshot_dir=source.snapshot_dir) if source.snapshot_dir else None
+    if snapshot is not None:
+        master_df, activities_df, meta = snapshot
+        initial = (master_df, activities_df, meta['written_at'], "🎉 로컬 스냅샷에서 데이터 로드 완료!")
+    return BackgroundDataset(loader, ttl=DATA_TTL_SECONDS, initial=initial)
+
+
+def load_data():
+    """설정된 모드에 따라 (master_df, activities_df, loaded_at)를 반환합니다. loaded_at은 SWR 모드에서만 제공됩니다."""
+    if not STALE_WHILE_REVALIDATE:
+        master_df, activities_df = load_data_from_gsheet()
+        return master_df, activities_df, None
+
+    try:
+        master_df, activities_df, loaded_at, _ = get_background_dataset().get()
+        return master_df, activities_df, loaded_at
+
+    except Exception as e:
+        st.error(f"데이터 로드 중 에러 발생: {e}")
+        return None, None, None
+
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def get_overview_aggregates(data_version, granularity, _master_df, _activities_df):
+    """'전체' 화면의 KPI/차트 집계. 데이터 버전과 타임라인 단위가 같으면 rerun마다 다시 계산하지 않습니다."""
+    return get_query_engine(data_version, _master_df, _activities_df).overview_aggregates(granularity)
+
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def get_alerts(data_version, day, _master_df, _activities_df):
+    """알림 규칙(alert_rules.py) 결과. 데이터 버전과 날짜가 같으면 rerun마다 다시 계산하지 않습니다."""
+    return evaluate_rules(_master_df, _activities_df, day, index=get_alert_index(data_version, _master_df, _activities_df))
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def get_alert_index(data_version, _master_df, _activities_df):
+    """알림 규칙용 날짜 정렬 인덱스. 데이터 버전별로 한 번만 만들고, 날짜가 바뀌어도 재사용합니다."""
+    return AlertIndex(_master_df, _activities_df)
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def get_query_engine(data_version, _master_df, _activities_df):
+    """집계 조회 엔진 (KOL_QUERY_ENGINE: pandas 또는 duckdb). 데이터 버전별로 한 번 만들어 모든 세션이 공유합니다."""
+    return make_engine(_master_df, _activities_df)
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def get_kol_index(data_version, _master_df, _activities_df):
+    """KOL 상세 조회용 인덱스. 데이터 버전별로 한 번만 만들고 모든 세션이 공유합니다 (복사 없음)."""
+    return KolIndex(_master_df, _activities_df)
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def get_table_positions(data_version, table_key, filter_column, query, sort_column, descending, _df):
+    """필터/정렬 결과 행 위치. 같은 조건으로 페이지만 넘길 때는 다시 정렬하지 않습니다."""
+    return table_positions(_df, filter_column, query, sort_column, descending)
+
 # -----------------------------------------------------------------
-# 2. 조건부 서식 함수 정의 (이전과 동일)
+# 2. 조건부 서식 함수 정의 (styling.py의 highlight_master_rows / highlight_activity_rows 사용)
 # -----------------------------------------------------------------
 
-def highlight_master_row(row, today, alert_days=30):
-    """KOL_Master 테이블에서 계약 만료 임박 행을 강조합니다."""
-    contract_end = row['Contract_End']
-    is_imminent = False
-    if pd.notnull(contract_end):
-        is_imminent = (contract_end.date() >= today.date()) and \
-                      (contract_end.date() <= (today + timedelta(days=alert_days)).date())
-    
-    if is_imminent:
-        return ['background-color: #ffd70040'] * len(row) 
-    return [''] * len(row)
-
-def highlight_activity_row(row, today):
-    """Activities 테이블에서 지연된 활동 행을 강조합니다."""
-    due_date = row['Due_Date']
-    status = row['Status']
-    
-    is_overdue = False
-    if pd.notnull(due_date):
-        is_overdue = (due_date.date() < today.date()) and (status != 'Done')
-    
-    if is_overdue:
-        return ['background-color: #ff4c4c40'] * len(row)
-    return [''] * len(row)
+def render_raw_table(title, table_key, df, data_version, highlight, date_column, today):
+    """필터/정렬/페이지 컨트롤이 있는 원본 데이터 표. 현재 페이지만 서식을 적용해 표시하고, 전체 표는 CSV 내보내기로 제공합니다."""
+    st.subheader(title)
+    columns = list(df.columns)
+    col_filter, col_query, col_sort, col_order, col_size = st.columns([2, 3, 2, 1, 1])
+    filter_column = col_filter.selectbox("필터 컬럼", columns, key=f"{table_key}_filter_column")
+    query = col_query.text_input("필터 값 (포함, 대소문자 무시)", key=f"{table_key}_query").strip()
+    sort_column = col_sort.selectbox("정렬 기준", ["(원본 순서)"] + columns, key=f"{table_key}_sort_column")
+    descending = col_order.toggle("내림차순", key=f"{table_key}_descending")
+    page_size = col_size.selectbox("페이지 크기", PAGE_SIZES, index=1, key=f"{table_key}_page_size")
+
+    sort_column = None if sort_column == "(원본 순서)" else sort_column
+    positions = get_table_positions(data_version, table_key, filter_column, query, sort_column, descending, df)
+    pages = page_count(len(positions), page_size)
+    page_key = f"{table_key}_page"
+    if st.session_state.get(page_key, 1) > pages:
+        st.session_state[page_key] = pages  # 필터로 행 수가 줄면 마지막 페이지로 이동
+    page = st.number_input(f"페이지 (전체 {pages})", min_value=1, max_value=pages, step=1, key=page_key)
+
+    page_df = page_rows(df, positions, page, page_size)
+    st.dataframe(
+        page_df.style.apply(highlight, today=today, axis=None).format({date_column: lambda x: x.strftime('%Y-%m-%d') if pd.notnull(x) else ''}),
+        use_container_width=True
+    )
+    first = (page - 1) * page_size
+    st.caption(f"전체 {len(df):,}행 중 {len(positions):,}행 일치 · {first + 1 if len(page_df) else 0:,}–{first + len(page_df):,}행 표시")
+    st.download_button(
+        "⬇️ 전체 표 내보내기 (CSV, 현재 필터/정렬)",
+        data=lambda: df.iloc[positions].to_csv(index=False).encode('utf-8-sig'),  # 누를 때만 전체 표를 변환합니다.
+        file_name=f"{table_key}.csv",
+        mime="text/csv",
+        key=f"{table_key}_export",
+        on_click='ignore',
+    )
 
 # -----------------------------------------------------------------
 # 3. Streamlit UI 그리기 
@@ -162,7 +249,7 @@ st.markdown(
 
 st.title("📊 KOL 활동 관리 대시보드 (MVP)")
 
-master_df, activities_df = load_data_from_gsheet()
+master_df, activities_df, loaded_at = load_data()
 
 st.sidebar.subheader("KOL 상세 조회 필터")
 if master_df is not None:
@@ -171,6 +258,56 @@ if master_df is not None:
 else:
     selected_name = st.sidebar.selectbox("KOL 이름을 선택하세요:", ["전체"])
 
+if loaded_at is not None:
+    age = int(time.time() - loaded_at)
+    background_dataset = get_background_dataset()
+    refreshing = " · 🔄 백그라운드 갱신 중" if background_dataset.refreshing else ""
+    st.sidebar.caption(f"🕒 데이터 기준: {datetime.fromtimestamp(loaded_at):%H:%M:%S} ({age}초 전){refreshing}")
+    if background_dataset.last_error is not None:
+        st.sidebar.warning(f"최근 데이터 갱신 실패 (이전 데이터 표시 중): {background_dataset.last_error}")
+
+# --- 데이터 연결 상태 (운영 확인용) ---
+with st.sidebar.expander("⚙️ 데이터 연결 상태", expanded=False):
+    auth_stats = get_auth_stats()
+    st.caption(f"클라이언트 인증: {auth_stats['clients_created']}회 / 토큰 갱신: {auth_stats['token_refreshes']}회")
+    probe_stats = get_probe_stats()
+    st.caption(f"변경 프로브: {probe_stats['probes']}회 중 {probe_stats['unchanged']}회 로드 생략 (적중률 {probe_stats['hit_ratio']:.0%})")
+    flights = LOAD_FLIGHTS.stats()
+    st.caption(f"데이터 로드 실행: {flights['executed']}회 / 동시 요청 병합: {flights['coalesced']}건")
+    st.caption(f"조회 엔진: {QUERY_ENGINE}")
+    usage = get_last_load_usage()
+    if usage:
+        st.caption(f"마지막 로드 API: 호출 {usage['calls']}회 / 재시도 {usage['retries']}회 / 한도 대기 {usage['throttle_wait']:.1f}초 / 백오프 대기 {usage['backoff_wait']:.1f}초")
+    memory = get_delta_sync().memory_report
+    if memory is not None:
+        for sheet_name, report in memory.items():
+            st.caption(f"{sheet_name} 메모리 (변환 전 → 후, bytes)")
+            st.dataframe(report, use_container_width=True)
+
+# --- 메모리 리포트 (관리자용): 세션 하나가 차지하는 메모리 ---
+# (접힌 expander 안의 코드도 rerun마다 실행되므로, KOL_MEMORY_REPORT=1 이고 토글을 켰을 때만 집계/큐브를 만들어 계산합니다)
+show_memory_report = MEMORY_REPORT and master_df is not None and activities_df is not None
+if show_memory_report and st.sidebar.toggle("🧮 메모리 리포트 (관리자)", key='memory_report'):
+    with st.sidebar.container(border=True):
+        data_version = get_data_version(master_df, activities_df)
+        granularity = st.session_state.get('timeline_granularity', DEFAULT_GRANULARITY)
+        agg = get_overview_aggregates(data_version, granularity, master_df, activities_df)
+        # st.cache_data는 세션(rerun)마다 반환값의 복사본을 넘기고, st.cache_resource는 한 객체를 공유합니다.
+        # SWR 모드의 데이터 프레임은 cache_resource로 공유되고, 기본 캐시 모드에서는 세션마다 복사됩니다.
+        data_frames = {'master_df': master_df, 'activities_df': activities_df}
+        agg_frames = {f"agg.{name}": frame for name, frame in agg.items() if isinstance(frame, pd.DataFrame)}
+        report = frame_memory({**data_frames, **agg_frames})
+        totals = report[report['Column'] == '(합계)'].set_index('Frame')['Bytes']
+        data_bytes = int(totals[list(data_frames)].sum())
+        agg_bytes = int(totals[list(agg_frames)].sum())
+        cube_bytes = get_query_engine(data_version, master_df, activities_df).cube.nbytes
+        per_session = agg_bytes + (0 if STALE_WHILE_REVALIDATE else data_bytes)
+        shared = cube_bytes + (data_bytes if STALE_WHILE_REVALIDATE else 0)
+        st.caption(f"압축 표현 모드: {'켜짐' if COMPACT_FRAMES else '꺼짐'} (KOL_COMPACT_FRAMES)")
+        st.caption(f"세션당 메모리: {per_session / 1e6:,.2f} MB / 전체 세션 공유: {shared / 1e6:,.2f} MB (활동 큐브 {cube_bytes / 1e6:,.2f} MB 포함)")
+        st.dataframe(totals.rename('Bytes').reset_index(), use_container_width=True, hide_index=True)
+        st.dataframe(report[report['Column'] != '(합계)'], use_container_width=True, hide_index=True)
+
 if master_df is not None and activities_df is not None:
 
     if selected_name == "전체":
@@ -180,16 +317,17 @@ if master_df is not None and activities_df is not None:
         # ===================================
         st.header("1. KPI 요약")
         
-        total_budget = master_df['Budget (USD)'].sum()
-        total_spent = master_df['Spent (USD)'].sum()
-        avg_completion = master_df['Completion_Rate'].mean()
-        avg_utilization = (total_spent / total_budget) * 100 if total_budget > 0 else 0
+        # KPI와 차트 집계는 데이터 버전별로 한 번만 계산해 둡니다 (aggregates.py).
+        # (타임라인 단위 선택 위젯은 2번 섹션에 있으므로 값은 session_state에서 읽습니다)
+        granularity = st.session_state.get('timeline_granularity', DEFAULT_GRANULARITY)
+        agg = get_overview_aggregates(get_data_version(master_df, activities_df), granularity, master_df, activities_df)
+        kpi = agg['kpi']
         
         col_kpi1, col_kpi2, col_kpi3, col_kpi4 = st.columns(4)
-        with col_kpi1: st.metric(label="총 KOL 인원", value=master_df.shape[0])
-        with col_kpi2: st.metric(label="총 예산 규모", value=f"${total_budget:,.0f}")
-        with col_kpi3: st.metric(label="평균 완료율", value=f"{avg_completion:.1f}%")
-        with col_kpi4: st.metric(label="예산 활용률", value=f"{avg_utilization:.1f}%")
+        with col_kpi1: st.metric(label="총 KOL 인원", value=kpi['kol_count'])
+        with col_kpi2: st.metric(label="총 예산 규모", value=f"${kpi['total_budget']:,.0f}")
+        with col_kpi3: st.metric(label="평균 완료율", value=f"{kpi['avg_completion']:.1f}%")
+        with col_kpi4: st.metric(label="예산 활용률", value=f"{kpi['avg_utilization']:.1f}%")
         
         st.divider()
 
@@ -197,10 +335,14 @@ if master_df is not None and activities_df is not None:
         # 2. 주요 차트 현황 (3x2 레이아웃 및 축 설정)
         # ===================================
         st.header("2. 주요 차트 현황")
+        st.radio(
+            "타임라인 단위", list(GRANULARITIES), format_func=GRANULARITIES.get,
+            key='timeline_granularity', horizontal=True,
+        )
+        unit = GRANULARITIES[granularity]
         
         # --- 💡 축 최대값 계산 ---
-        max_count = get_max_value(activities_df.groupby('YearMonth').size().reset_index(name='Count'), 'Count')
-        max_budget = get_max_value(master_df.groupby('Country')['Budget (USD)'].sum().reset_index(name='Total_Budget'), 'Total_Budget')
+        max_count = get_max_value(agg['timeline'], 'Count')
         
         # -----------------------------------
         # Row 1: 차트 3개 (파이차트, 파이차트, 혼합 세로 막대+선)
@@ -209,8 +351,7 @@ if master_df is not None and activities_df is not None:
 
         with col_r1_c1:
             st.subheader("활동 상태별 분포")
-            status_counts = activities_df['Status'].value_counts().reset_index()
-            status_counts.columns = ['Status', 'Count']
+            status_counts = agg['status_counts']
             
             base = alt.Chart(status_counts).encode(theta=alt.Theta("Count", stack=True), color=alt.Color("Status", title='상태'))
             
@@ -228,8 +369,7 @@ if master_df is not None and activities_df is not None:
         
         with col_r1_c2:
             st.subheader("KOL 등급별 분포")
-            type_counts = master_df['KOL_Type'].value_counts().reset_index()
-            type_counts.columns = ['Type', 'Count']
+            type_counts = agg['kol_type_counts']
             
             base = alt.Chart(type_counts).encode(theta=alt.Theta("Count", stack=True), color=alt.Color("Type", title='등급'))
             
@@ -246,14 +386,14 @@ if master_df is not None and activities_df is not None:
             st.altair_chart(chart2, use_container_width=True)
                 
         with col_r1_c3:
-            st.subheader("월별 총 활동 스케줄")
-            timeline_data = activities_df.groupby('YearMonth').size().reset_index(name='Count')
+            st.subheader(f"{unit}별 총 활동 스케줄")
+            timeline_data = agg['timeline']
             
             # Bar Chart (Volume)
             bar_chart = alt.Chart(timeline_data).mark_bar(color='#4c78a8').encode(
-                x=alt.X('YearMonth', title='월별 마감일', sort=timeline_data['YearMonth'].tolist()),
+                x=alt.X(PERIOD_COLUMN, title=f'{unit}별 마감일', sort=timeline_data[PERIOD_COLUMN].tolist()),
                 y=alt.Y('Count', title='활동 건수 (건)', axis=alt.Axis(format='d'), scale=alt.Scale(domain=[0, max_count])), 
-                tooltip=['YearMonth', alt.Tooltip('Count', title='활동 건수', format='d')]
+                tooltip=[PERIOD_COLUMN, alt.Tooltip('Count', title='활동 건수', format='d')]
             )
 
             # Text Label for Bar Chart
@@ -268,9 +408,9 @@ if master_df is not None and activities_df is not None:
 
             # Line Chart (Trend)
             line_chart = alt.Chart(timeline_data).mark_line(point=True, color='red').encode(
-                x=alt.X('YearMonth'), 
+                x=alt.X(PERIOD_COLUMN), 
                 y=alt.Y('Count'), 
-                tooltip=['YearMonth', alt.Tooltip('Count', title='활동 건수', format='d')]
+                tooltip=[PERIOD_COLUMN, alt.Tooltip('Count', title='활동 건수', format='d')]
             )
 
             chart3 = (bar_chart + text_bar + line_chart).interactive()
@@ -284,17 +424,15 @@ if master_df is not None and activities_df is not None:
         col_r2_c1, col_r2_c2, col_r2_c3 = st.columns(3)
 
         with col_r2_c1:
-            st.subheader("월별 완료 활동 트렌드")
-            completed_df = activities_df[activities_df['Status'] == 'Done'].copy()
-            completed_df['YearMonth'] = completed_df['Due_Date'].dt.to_period('M').astype(str)
-            completed_timeline = completed_df.groupby('YearMonth').size().reset_index(name='Completed')
+            st.subheader(f"{unit}별 완료 활동 트렌드")
+            completed_timeline = agg['completed_timeline']
             
             max_completed = get_max_value(completed_timeline, 'Completed')
 
             line = alt.Chart(completed_timeline).mark_line(point=True, color='green').encode(
-                x=alt.X('YearMonth', title='월별 완료 시점', sort=completed_timeline['YearMonth'].tolist()),
+                x=alt.X(PERIOD_COLUMN, title=f'{unit}별 완료 시점', sort=completed_timeline[PERIOD_COLUMN].tolist()),
                 y=alt.Y('Completed', title='완료된 활동 건수 (건)', axis=alt.Axis(format='d'), scale=alt.Scale(domain=[0, max_completed])), 
-                tooltip=['YearMonth', alt.Tooltip('Completed', title='완료된 활동 건수', format='d')]
+                tooltip=[PERIOD_COLUMN, alt.Tooltip('Completed', title='완료된 활동 건수', format='d')]
             )
             
             text_line = line.mark_text(
@@ -311,9 +449,7 @@ if master_df is not None and activities_df is not None:
 
         with col_r2_c2:
             st.subheader("국가별 총 예산 (USD)") 
-            country_summary = master_df.groupby('Country').agg(
-                Total_Budget=('Budget (USD)', 'sum'),
-            ).reset_index()
+            country_summary = agg['country_summary']
 
             max_budget_single = get_max_value(country_summary, 'Total_Budget')
 
@@ -337,8 +473,7 @@ if master_df is not None and activities_df is not None:
         
         with col_r2_c3:
             st.subheader("활동 유형별 분포")
-            type_counts = activities_df['Activity_Type'].value_counts().reset_index()
-            type_counts.columns = ['Type', 'Count']
+            type_counts = agg['activity_type_counts']
             
             max_type_count = get_max_value(type_counts, 'Count')
 
@@ -367,7 +502,7 @@ if master_df is not None and activities_df is not None:
         # -----------------------------------
         st.subheader("🏆 우수 KOL별 완료율 순위 (Top 10)")
         
-        top_kols = master_df.sort_values(by='Completion_Rate', ascending=False).head(10).reset_index(drop=True)
+        top_kols = agg['top_kols']
         max_completion = get_max_value(top_kols, 'Completion_Rate', is_percentage=True)
         
         bar = alt.Chart(top_kols).mark_bar().encode( 
@@ -399,33 +534,27 @@ if master_df is not None and activities_df is not None:
         
         today = datetime.now()
         alert_found = False
+        # alert.py와 같은 규칙(alert_rules.ALERT_RULES)을 데이터 버전·날짜별로 한 번만 평가합니다.
+        alerts = get_alerts(get_data_version(master_df, activities_df), today.date(), master_df, activities_df)
 
-        contract_alert_date = today + timedelta(days=30)
-        imminent_contracts = master_df[
-            (master_df['Contract_End'] <= contract_alert_date) &
-            (master_df['Contract_End'] >= today)
-        ].copy()
+        imminent_contracts = alerts['contract_expiry']
         
-        with st.expander(f"🚨 계약 만료 임박 ({imminent_contracts.shape[0]} 건) - 30일 이내", expanded=False):
+        with st.expander(f"🚨 계약 만료 임박 ({imminent_contracts.shape[0]} 건) - {CONTRACT_ALERT_DAYS}일 이내", expanded=False):
             if not imminent_contracts.empty:
                 alert_found = True
-                imminent_contracts['D-Day'] = (imminent_contracts['Contract_End'] - today).dt.days
-                st.dataframe(imminent_contracts[['Name', 'Country', 'Contract_End', 'D-Day']].astype(str), use_container_width=True)
+                tier_counts = imminent_contracts['Tier'].value_counts().sort_index()
+                st.caption("알림 단계별: " + " · ".join(f"D-{tier} {count}건" for tier, count in tier_counts.items()))
+                st.dataframe(imminent_contracts.astype(str), use_container_width=True)
             else:
                 st.info("해당 없음")
 
-        overdue_activities = activities_df[
-            (activities_df['Due_Date'] < today) &
-            (activities_df['Status'] != 'Done')
-        ].copy()
+        overdue_activities = alerts['activity_overdue']
 
         with st.expander(f"🔥 활동 지연 ({overdue_activities.shape[0]} 건)", expanded=True): 
             if not overdue_activities.empty:
                 alert_found = True
-                overdue_activities = pd.merge(overdue_activities, master_df[['Kol_ID', 'Name']], on='Kol_ID', how='left')
-                overdue_activities['Overdue (Days)'] = (today - overdue_activities['Due_Date']).dt.days
                 st.error("아래 활동들이 지연되고 있습니다. Follow-up이 필요합니다.")
-                st.dataframe(overdue_activities[['Name', 'Activity_Type', 'Due_Date', 'Status', 'Overdue (Days)']].astype(str), use_container_width=True)
+                st.dataframe(overdue_activities.astype(str), use_container_width=True)
             else:
                 st.info("해당 없음")
         
@@ -437,38 +566,32 @@ if master_df is not None and activities_df is not None:
         # ===================================
         st.header("4. 원본 데이터 (Raw Data - 시각화 적용)")
         today = datetime.now() 
+        data_version = get_data_version(master_df, activities_df)
 
-        st.subheader("KOL 마스터")
-        st.dataframe(
-            master_df.style.apply(highlight_master_row, today=today, axis=1).format({'Contract_End': lambda x: x.strftime('%Y-%m-%d') if pd.notnull(x) else ''}),
-            use_container_width=True
-        ) 
+        render_raw_table("KOL 마스터", 'kol_master', master_df, data_version, highlight_master_rows, 'Contract_End', today)
         
-        st.subheader("모든 활동 내역")
-        st.dataframe(
-            activities_df.style.apply(highlight_activity_row, today=today, axis=1).format({'Due_Date': lambda x: x.strftime('%Y-%m-%d') if pd.notnull(x) else ''}),
-            use_container_width=True
-        )
+        render_raw_table("모든 활동 내역", 'activities', activities_df, data_version, highlight_activity_rows, 'Due_Date', today)
 
     # --- (KOL 상세 뷰 - 이전과 동일) ---
     else:
         try:
-            selected_kol_id = master_df[master_df['Name'] == selected_name]['Kol_ID'].iloc[0]
+            data_version = get_data_version(master_df, activities_df)
+            kol_index = get_kol_index(data_version, master_df, activities_df)
+            selected_kol_id = kol_index.kol_id(selected_name)
             
             st.header(f"👨‍⚕️ {selected_name} 님 상세 정보")
-            kol_details = master_df[master_df['Kol_ID'] == selected_kol_id]
+            kol_details = kol_index.master_rows(selected_kol_id)
             st.dataframe(kol_details.astype(str), use_container_width=True) 
             
             st.divider()
             st.header(f"📝 {selected_name} 님 활동 내역")
-            kol_activities = activities_df[activities_df['Kol_ID'] == selected_kol_id]
+            kol_activities = kol_index.activities(selected_kol_id)
             
             if not kol_activities.empty:
                 col_detail1, col_detail2 = st.columns(2)
                 
-                # 상세 KPI 계산
-                total = kol_activities.shape[0]
-                done = kol_activities[kol_activities['Status'] == 'Done'].shape[0]
+                # 상세 KPI 계산 (활동 큐브의 해당 KOL 조각에서)
+                total, done, kol_status_counts = get_query_engine(data_version, master_df, activities_df).cube.kol_summary(selected_kol_id)
                 completion_rate = (done / total) * 100 if total > 0 else 0
                 
                 kol_budget = kol_details['Budget (USD)'].iloc[0]
@@ -484,8 +607,6 @@ if master_df is not None and activities_df is not None:
                 with col_detail2:
                     if 'Status' in kol_activities.columns:
                         st.subheader("활동 상태 요약")
-                        kol_status_counts = kol_activities['Status'].value_counts().reset_index()
-                        kol_status_counts.columns = ['Status', 'Count']
                         
                         chart = alt.Chart(kol_status_counts).mark_bar(height=15).encode(
                             x=alt.X('Count', title='건수'),
@@ -499,7 +620,7 @@ if master_df is not None and activities_df is not None:
                 st.subheader("활동 상세 목록 (Raw Data)")
                 # --- 상세 뷰 로데이터 조건부 서식 적용 ---
                 st.dataframe(
-                    kol_activities.style.apply(highlight_activity_row, today=datetime.now(), axis=1).format({'Due_Date': lambda x: x.strftime('%Y-%m-%d') if pd.notnull(x) else ''}),
+                    kol_activities.style.apply(highlight_activity_rows, today=datetime.now(), axis=None).format({'Due_Date': lambda x: x.strftime('%Y-%m-%d') if pd.notnull(x) else ''}),
                     column_config={
                         "File_Link": None, 
                         "자료 열람": st.column_config.LinkColumn(
@@ -512,7 +633,7 @@ if master_df is not None and activities_df is not None:
                 )
             else:
                 st.warning("이 KOL에 배정된 활동 내역이 없습니다.")
-        except IndexError:
+        except KeyError:
             st.error(f"'{selected_name}' 님의 'Kol_ID'를 'KOL_Master' 시트에서 찾을 수 없습니다.")
         except Exception as e:
             st.error(f"데이터 표시 중 에러: {e}")
\ No newline at end of file
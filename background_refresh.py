@@ -0,0 +1,66 @@
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundDataset:
+    """
+    Stale-while-revalidate 방식의 데이터셋 보관소.
+
+    - get()은 마지막으로 성공한 데이터를 즉시 반환합니다 (최초 1회만 동기 로드).
+    - 데이터가 ttl(초)보다 오래되면 백그라운드 스레드에서 loader를 실행하고,
+      끝나면 (master_df, activities_df, loaded_at, message) 묶음을 한 번에 교체합니다.
+    - 갱신에 실패하면 이전 데이터를 계속 제공하고, ttl 뒤에 다시 시도합니다.
+
+    loader는 Streamlit UI를 호출하지 않는 함수여야 합니다: () -> (master_df, activities_df, message)
+    """
+
+    def __init__(self, loader, ttl, initial=None):
+        self._loader = loader
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._state = initial  # (master_df, activities_df, loaded_at, message)
+        self._next_refresh_at = initial[2] + ttl if initial is not None else 0
+        self._refreshing = False
+        self.last_error = None
+
+    @property
+    def refreshing(self):
+        return self._refreshing
+
+    def get(self):
+        """현재 데이터 묶음 (master_df, activities_df, loaded_at, message)을 반환합니다."""
+        state = self._state
+        if state is None:
+            with self._lock:
+                if self._state is None:
+                    self._state = self._load()
+                    self._next_refresh_at = self._state[2] + self._ttl
+                state = self._state
+        elif time.time() >= self._next_refresh_at:
+            self._start_refresh()
+        return state
+
+    def _load(self):
+        master_df, activities_df, message = self._loader()
+        return master_df, activities_df, time.time(), message
+
+    def _start_refresh(self):
+        with self._lock:
+            if self._refreshing or time.time() < self._next_refresh_at:
+                return
+            self._refreshing = True
+            self._next_refresh_at = time.time() + self._ttl
+        threading.Thread(target=self._refresh, name='kol-data-refresh', daemon=True).start()
+
+    def _refresh(self):
+        try:
+            self._state = self._load()  # 참조 교체 한 번으로 원자적으로 바뀝니다.
+            self.last_error = None
+        except Exception as e:
+            logger.warning("백그라운드 데이터 갱신 실패 (이전 데이터 유지): %s", e)
+            self.last_error = e
+        finally:
+            self._refreshing = False
@@ -0,0 +1,96 @@
+"""
+알림 규칙 평가 벤치마크: 전체 행 마스크 (이전 방식) vs AlertIndex 이진 탐색 (alert_rules.py)
+
+두 방식 모두 evaluate_rules로 같은 결과 프레임(Name 조인, 일수, Tier 포함)을 만들고, 행을 고르는 부분만 다릅니다.
+  마스크  : ScanIndex — 규칙마다 전체 행의 날짜 구간/Status 마스크를 만들고 결과 행을 날짜 순으로 정렬
+  인덱스  : AlertIndex — 정렬된 날짜 배열에서 이진 탐색으로 구간을 잘라냄
+지난 이력(대부분 완료된 활동)이 해마다 쌓인다고 보고 활동 수를 늘려 가며,
+규칙 평가 시간과 인덱스 생성 시간(데이터 버전별 1회)을 비교하고 두 방식의 결과가 같은지 확인합니다.
+
+사용법:
+    python bench_alert_rules.py [--sizes 100000 1000000 4000000] [--repeat 5]
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from alert_rules import ALERT_RULES, AlertIndex, day_offsets, evaluate_rules, rule_mask
+
+
+def make_frames(n_activities, seed=0):
+    """오늘 기준 과거 10년 ~ 미래 90일 활동. 30일보다 지난 활동은 98%가 완료 상태입니다."""
+    rng = np.random.default_rng(seed)
+    n_kols = max(n_activities // 200, 1)
+    today = pd.Timestamp.now().normalize()
+
+    master = pd.DataFrame({
+        'Kol_ID': np.arange(1, n_kols + 1, dtype='int32'),
+        'Name': [f"KOL {i}" for i in range(1, n_kols + 1)],
+        'Country': pd.Categorical(rng.choice(['KR', 'US', 'JP'], n_kols)),
+        'Contract_End': today + pd.to_timedelta(rng.integers(-3650, 365, n_kols), 'D'),
+    })
+    offsets = rng.integers(-3650, 90, n_activities)
+    old = offsets < -30
+    status = np.where(old & (rng.random(n_activities) < 0.98), 'Done', rng.choice(['Planned', 'Delayed', 'Done'], n_activities))
+    activities = pd.DataFrame({
+        'Activity_ID': np.arange(1, n_activities + 1, dtype='int32'),
+        'Kol_ID': rng.integers(1, n_kols + 1, n_activities).astype('int32'),
+        'Activity_Type': pd.Categorical(rng.choice(['Lecture', 'Post', 'Video'], n_activities)),
+        'Due_Date': today + pd.to_timedelta(offsets, 'D'),
+        'Status': pd.Categorical(status),
+    })
+    return master, activities, today
+
+
+class ScanIndex(AlertIndex):
+    """이전 방식: 정렬 인덱스 없이 규칙마다 전체 행 마스크로 결과 행을 고르는 AlertIndex (query만 다름)."""
+
+    def __init__(self, master_df, activities_df, rules=ALERT_RULES):
+        self.tables = {'master': master_df, 'activities': activities_df}
+        kols = master_df.drop_duplicates('Kol_ID').set_index('Kol_ID')
+        self.names = kols['Name']
+        self.kol_types = kols['KOL_Type'] if 'KOL_Type' in kols.columns else pd.Series(dtype=object)
+
+    def query(self, rule, today):
+        df = self.tables[rule['table']]
+        positions = np.flatnonzero(rule_mask(df, rule, today))
+        offsets = day_offsets(df[rule['date']].iloc[positions], today).astype(np.int64)
+        order = np.argsort(offsets, kind='stable')  # 날짜 순 (같은 날짜는 원래 행 순서)
+        return positions[order], offsets[order]
+
+
+def best_of(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100_000, 1_000_000, 4_000_000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'활동 수':>12} {'마스크':>10} {'인덱스 조회':>12} {'인덱스 생성':>12}   결과 행 수")
+    for n in args.sizes:
+        master, activities, today = make_frames(n)
+        scan_index = ScanIndex(master, activities)
+        scan_time, scanned = best_of(lambda: evaluate_rules(master, activities, today, index=scan_index), args.repeat)
+        build_time, index = best_of(lambda: AlertIndex(master, activities), 1)
+        query_time, results = best_of(lambda: evaluate_rules(master, activities, today, index=index), args.repeat)
+
+        for key, rows in results.items():
+            pd.testing.assert_frame_equal(rows, scanned[key], obj=key)
+        counts = ', '.join(f"{key} {len(rows):,}" for key, rows in results.items())
+        print(f"{n:>12,} {scan_time * 1000:>8.1f}ms {query_time * 1000:>10.1f}ms {build_time * 1000:>10.1f}ms   {counts}")
+
+    print("\n두 방식의 결과 행이 동일합니다.")
+
+
+if __name__ == '__main__':
+    main()
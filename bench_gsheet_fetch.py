@@ -0,0 +1,140 @@
+"""
+Google Sheets 로드 방식 비교 벤치마크 (네트워크 없이 가짜 Sheets 백엔드 사용)
+
+- per_sheet: gc.open → sh.worksheet() x2 → get_as_dataframe() x2 (이전 방식)
+- batch    : gc.open → values_batch_get() 1회 (fetch_raw_frames_batch)
+
+사용법:
+    python bench_gsheet_fetch.py [--latency 0.15] [--activities 20000] [--repeat 3]
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from kol_data import (
+    SPREADSHEET_NAME, WORKSHEET1_NAME, WORKSHEET2_NAME,
+    fetch_raw_frames_batch, fetch_raw_frames_per_sheet,
+)
+
+
+# -----------------------------------------------------------------
+# 가짜 Sheets 백엔드 (API 호출마다 latency 만큼 대기하고 호출 수를 셉니다)
+# -----------------------------------------------------------------
+
+class FakeWorksheet:
+    def __init__(self, spreadsheet, title, values):
+        self.spreadsheet = spreadsheet
+        self.title = title
+        self.values = values
+        self.row_count = len(values) + 100  # 실제 시트처럼 빈 행 여유분을 둡니다.
+        self.col_count = max(len(row) for row in values)
+
+
+class FakeSpreadsheet:
+    def __init__(self, client, sheets):
+        self.client = client
+        self._sheets = {title: FakeWorksheet(self, title, values) for title, values in sheets.items()}
+
+    def _values_for(self, a1_range):
+        return self._sheets[a1_range.strip("'").replace("''", "'")].values
+
+    def worksheet(self, title):
+        self.client.round_trip()  # 워크시트 메타데이터 조회
+        return self._sheets[title]
+
+    def values_get(self, a1_range, params=None):
+        self.client.round_trip()
+        return {'range': a1_range, 'values': self._values_for(a1_range)}
+
+    def values_batch_get(self, ranges, params=None):
+        self.client.round_trip()
+        return {'valueRanges': [{'range': r, 'values': self._values_for(r)} for r in ranges]}
+
+
+class FakeClient:
+    def __init__(self, sheets, latency):
+        self.sheets = sheets
+        self.latency = latency
+        self.round_trips = 0
+
+    def round_trip(self):
+        self.round_trips += 1
+        time.sleep(self.latency)
+
+    def open(self, title):
+        self.round_trip()  # Drive 파일 검색
+        self.round_trip()  # 스프레드시트 메타데이터 조회
+        return FakeSpreadsheet(self, self.sheets)
+
+
+def _to_values(df):
+    """DataFrame을 Sheets API 응답과 같은 형태(헤더 + 행, 빈 값은 생략/빈 문자열)로 바꿉니다."""
+    rows = [list(df.columns)]
+    for record in df.astype(object).where(df.notna(), '').to_numpy().tolist():
+        while record and record[-1] == '':
+            record.pop()  # API는 행 끝의 빈 셀을 돌려주지 않습니다.
+        rows.append(record)
+    return rows
+
+
+def make_sheets(n_kols, n_activities, seed=0):
+    rng = np.random.default_rng(seed)
+    master = pd.DataFrame({
+        'Kol_ID': np.arange(1, n_kols + 1),
+        'Name': [f"KOL {i}" for i in range(1, n_kols + 1)],
+        'Country': rng.choice(['Korea', 'USA', 'Japan', 'China'], n_kols),
+        'KOL_Type': rng.choice(['A', 'B', 'C'], n_kols),
+        'Status': rng.choice(['Active', 'Inactive'], n_kols),
+        'Contract_End': (pd.Timestamp('2025-01-01') + pd.to_timedelta(rng.integers(0, 730, n_kols), 'D')).strftime('%Y-%m-%d'),
+        'Budget (USD)': rng.integers(1_000, 50_000, n_kols),
+        'Spent (USD)': rng.integers(0, 50_000, n_kols),
+    })
+    activities = pd.DataFrame({
+        'Activity_ID': np.arange(1, n_activities + 1),
+        'Kol_ID': rng.integers(1, n_kols + 1, n_activities),
+        'Activity_Type': rng.choice(['Lecture', 'Advisory', 'Post', 'Video'], n_activities),
+        'Due_Date': (pd.Timestamp('2025-01-01') + pd.to_timedelta(rng.integers(0, 730, n_activities), 'D')).strftime('%Y-%m-%d'),
+        'Status': rng.choice(['Planned', 'Done', 'Delayed'], n_activities),
+        'File_Link': '',
+    })
+    return {WORKSHEET1_NAME: _to_values(master), WORKSHEET2_NAME: _to_values(activities)}
+
+
+def run(loader, sheets, latency, repeat):
+    best, trips, frames = float('inf'), 0, None
+    for _ in range(repeat):
+        gc = FakeClient(sheets, latency)
+        start = time.perf_counter()
+        frames = loader(gc.open(SPREADSHEET_NAME))
+        best = min(best, time.perf_counter() - start)
+        trips = gc.round_trips
+    return best, trips, frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--latency', type=float, default=0.15, help="API 호출 1회당 지연 시간(초)")
+    parser.add_argument('--kols', type=int, default=500)
+    parser.add_argument('--activities', type=int, default=20_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    sheets = make_sheets(args.kols, args.activities)
+    print(f"KOL {args.kols}명 / 활동 {args.activities}건, 호출당 지연 {args.latency * 1000:.0f}ms\n")
+
+    results = {}
+    for name, loader in (('per_sheet', fetch_raw_frames_per_sheet), ('batch', fetch_raw_frames_batch)):
+        elapsed, trips, frames = run(loader, sheets, args.latency, args.repeat)
+        results[name] = frames
+        print(f"{name:>10}: 왕복 {trips}회 (open 포함), {elapsed * 1000:8.1f} ms")
+
+    for old, new in zip(results['per_sheet'], results['batch']):
+        # 이전 방식은 시트의 빈 행까지 읽어 정수 컬럼이 float이 되므로, 값만 비교합니다.
+        pd.testing.assert_frame_equal(old.reset_index(drop=True), new.reset_index(drop=True), check_dtype=False)
+    print("\n두 방식의 결과 DataFrame 값이 동일합니다.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+"""
+파생 지표 계산 벤치마크: 행 단위 apply/iterrows (이전 방식) vs metrics.py / alert_rules.py (벡터 연산)
+
+- done      : Status.apply(lambda x: 1 if x == 'Done' else 0)  vs  done_flag()
+- util      : Utilization_Rate.apply(lambda x: min(x, 100))     vs  utilization_rate()
+- d_day     : iterrows()로 (Due_Date - today).days               vs  day_offsets()
+- overdue   : iterrows()로 (today - Due_Date).days               vs  rule_mask(activity_overdue 규칙) + day_offsets()
+
+today는 알림 규칙과 같이 오늘 자정입니다.
+
+사용법:
+    python bench_metrics.py [--sizes 10000 100000 1000000] [--repeat 3]
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from alert_rules import ALERT_RULES, day_offsets, rule_mask
+from metrics import done_flag, utilization_rate
+
+
+def make_frames(n_activities, seed=0):
+    rng = np.random.default_rng(seed)
+    n_kols = max(n_activities // 40, 1)
+    master = pd.DataFrame({
+        'Budget (USD)': rng.integers(0, 50_000, n_kols).astype('float64'),
+        'Spent (USD)': rng.integers(0, 60_000, n_kols).astype('float64'),
+    })
+    activities = pd.DataFrame({
+        'Status': pd.Categorical(rng.choice(['Planned', 'Done', 'Delayed'], n_activities)),
+        'Due_Date': pd.Timestamp('2025-01-01') + pd.to_timedelta(rng.integers(0, 730, n_activities), 'D'),
+    })
+    return master, activities
+
+
+# -----------------------------------------------------------------
+# 이전 방식 (행 단위)
+# -----------------------------------------------------------------
+
+def legacy_done(activities, today):
+    return activities['Status'].astype(object).apply(lambda x: 1 if x == 'Done' else 0)
+
+
+def legacy_util(master, today):
+    rate = (master['Spent (USD)'] / master['Budget (USD)']) * 100
+    return rate.fillna(0).apply(lambda x: min(x, 100))
+
+
+def legacy_d_day(activities, today):
+    return pd.Series([(row['Due_Date'] - today).days for _, row in activities.iterrows()], index=activities.index)
+
+
+def legacy_overdue(activities, today):
+    # 오늘 마감인 Planned 활동은 마감 임박(activity_due)으로만 알리므로 제외합니다.
+    due_today = (activities['Due_Date'] == today) & (activities['Status'] != 'Planned')
+    overdue = activities[((activities['Due_Date'] < today) | due_today) & (activities['Status'] != 'Done')]
+    return pd.Series([(today - row['Due_Date']).days for _, row in overdue.iterrows()], index=overdue.index)
+
+
+# -----------------------------------------------------------------
+# metrics.py / alert_rules.py (벡터 연산)
+# -----------------------------------------------------------------
+
+def vector_done(activities, today):
+    return done_flag(activities['Status'])
+
+
+def vector_util(master, today):
+    return utilization_rate(master['Spent (USD)'], master['Budget (USD)'])
+
+
+def vector_d_day(activities, today):
+    return pd.Series(day_offsets(activities['Due_Date'], today), index=activities.index)
+
+
+def vector_overdue(activities, today):
+    overdue = activities[rule_mask(activities, ALERT_RULES['activity_overdue'], today)]
+    return pd.Series(-day_offsets(overdue['Due_Date'], today), index=overdue.index)
+
+
+CASES = (
+    ('done', 'activities', legacy_done, vector_done),
+    ('util', 'master', legacy_util, vector_util),
+    ('d_day', 'activities', legacy_d_day, vector_d_day),
+    ('overdue', 'activities', legacy_overdue, vector_overdue),
+)
+
+
+def best_of(fn, frame, today, repeat):
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(frame, today)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000], help="활동 행 수")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    today = pd.Timestamp.now().normalize()
+    print(f"{'rows':>10} {'metric':>8} {'legacy (ms)':>12} {'vector (ms)':>12} {'speedup':>9}")
+    for n in args.sizes:
+        frames = dict(zip(('master', 'activities'), make_frames(n)))
+        for name, frame_name, legacy, vector in CASES:
+            frame = frames[frame_name]
+            # 행 단위 방식은 느리므로 큰 크기에서는 1회만 측정합니다.
+            legacy_time, expected = best_of(legacy, frame, today, 1 if n >= 1_000_000 else args.repeat)
+            vector_time, actual = best_of(vector, frame, today, args.repeat)
+            pd.testing.assert_series_equal(expected, actual, check_dtype=False, check_names=False)
+            print(f"{n:>10,} {name:>8} {legacy_time * 1000:12.1f} {vector_time * 1000:12.2f} {legacy_time / vector_time:8.0f}x")
+
+    print("\n두 방식의 계산 결과가 동일합니다.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,191 @@
+"""
+알림 발송 벤치마크: 메시지마다 새 연결 (이전 방식) vs notifications.py (연결 재사용 + 동시 발송 제한)
+
+같은 프로세스에 로컬 SMTP / HTTP 테스트 서버를 띄우고, 받는 사람별 요약을 보내는 시간과
+서버가 받은 연결 수 / 메시지 수를 비교합니다. 서버는 응답 전에 --latency 만큼 기다려 원격 서버를 흉내 냅니다.
+
+사용법:
+    python bench_notifications.py [--alerts 5000] [--recipients 500] [--concurrency 4] [--latency 0.005]
+"""
+import argparse
+import http.server
+import json
+import smtplib
+import socketserver
+import threading
+import time
+from email.message import EmailMessage
+
+import numpy as np
+import pandas as pd
+import requests
+
+from notifications import SmtpSender, WebhookSender, build_digests, render_lines
+
+
+# -----------------------------------------------------------------
+# 로컬 테스트 서버
+# -----------------------------------------------------------------
+
+class StandInStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.messages = 0
+
+    def add(self, connections=0, messages=0):
+        with self.lock:
+            self.connections += connections
+            self.messages += messages
+
+
+class SmtpStandIn(socketserver.ThreadingTCPServer):
+    """EHLO/MAIL/RCPT/DATA/QUIT만 처리하는 최소 SMTP 서버 (받은 메일은 개수만 셉니다)."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.stats = StandInStats()
+        super().__init__(('127.0.0.1', 0), SmtpHandler)
+
+
+class SmtpHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(line.encode() + b'\r\n')
+
+    def handle(self):
+        self.server.stats.add(connections=1)
+        self.reply('220 stand-in ESMTP')
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode(errors='replace').strip().upper()
+            if command.startswith('EHLO'):
+                self.reply('250 stand-in')
+            elif command.startswith('DATA'):
+                self.reply('354 end with <CRLF>.<CRLF>')
+                while self.rfile.readline() not in (b'.\r\n', b''):
+                    pass
+                time.sleep(self.server.latency)
+                self.server.stats.add(messages=1)
+                self.reply('250 OK')
+            elif command.startswith('QUIT'):
+                self.reply('221 bye')
+                return
+            else:  # HELO, MAIL, RCPT, RSET, NOOP
+                self.reply('250 OK')
+
+
+class HttpHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive
+    disable_nagle_algorithm = True  # 헤더와 본문을 따로 쓰므로, 켜 두면 keep-alive 연결에서 응답이 지연됩니다.
+
+    def setup(self):
+        super().setup()
+        self.server.stats.add(connections=1)
+
+    def do_POST(self):
+        json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        time.sleep(self.server.latency)
+        self.server.stats.add(messages=1)
+        self.send_response(200)
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'ok')
+
+    def log_message(self, *args):
+        pass
+
+
+def start_http_stand_in(latency):
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), HttpHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.stats = StandInStats()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# -----------------------------------------------------------------
+# 이전 방식: 메시지마다 연결을 새로 열고 순서대로 보냄
+# -----------------------------------------------------------------
+
+def send_smtp_per_message(digests, subject, host, port):
+    for recipient, body in zip(digests['Recipient'], digests['Body']):
+        message = EmailMessage()
+        message['From'], message['To'], message['Subject'] = 'kol-alert@localhost', recipient, subject
+        message.set_content(body)
+        with smtplib.SMTP(host, port) as conn:
+            conn.send_message(message)
+
+
+def send_http_per_message(digests, subject, url):
+    for recipient, body in zip(digests['Recipient'], digests['Body']):
+        requests.post(url, json={'text': f"{subject} → {recipient}\n{body}"}).raise_for_status()
+
+
+# -----------------------------------------------------------------
+# 실행
+# -----------------------------------------------------------------
+
+def make_digests(n_alerts, n_recipients, seed=0):
+    rng = np.random.default_rng(seed)
+    names = pd.Series([f"KOL {i}" for i in rng.integers(0, n_recipients * 2, n_alerts)])
+    frame = pd.DataFrame({'Name': names})
+    lines = "  - [D-" + pd.Series(rng.integers(0, 30, n_alerts)).astype(str) + "] " + names + " - 활동 마감"
+    recipients = pd.Series([f"owner{i % n_recipients}@example.com" for i in range(n_recipients * 2)],
+                           index=[f"KOL {i}" for i in range(n_recipients * 2)])
+    return build_digests(render_lines("🔔 알림", frame, lines), recipients)
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--alerts', type=int, default=5000)
+    parser.add_argument('--recipients', type=int, default=500)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--latency', type=float, default=0.005, help="테스트 서버의 메시지당 응답 지연(초)")
+    args = parser.parse_args()
+
+    build_time, digests = timed(lambda: make_digests(args.alerts, args.recipients))
+    subject = "[KOL 알림] 벤치마크"
+    print(f"알림 {args.alerts:,}건 → 받는 사람 {len(digests):,}명 요약 ({build_time * 1000:.1f} ms)")
+
+    smtp_server = SmtpStandIn(args.latency)
+    threading.Thread(target=smtp_server.serve_forever, daemon=True).start()
+    host, port = smtp_server.server_address
+    http_server = start_http_stand_in(args.latency)
+    url = f"http://127.0.0.1:{http_server.server_address[1]}/hook"
+
+    cases = [
+        ('smtp  메시지마다 연결', smtp_server, lambda: send_smtp_per_message(digests, subject, host, port)),
+        ('smtp  SmtpSender', smtp_server,
+         lambda: SmtpSender(host=host, port=port, concurrency=args.concurrency).send_all(digests, subject)),
+        ('http  메시지마다 연결', http_server, lambda: send_http_per_message(digests, subject, url)),
+        ('http  WebhookSender', http_server,
+         lambda: WebhookSender(url=url, concurrency=args.concurrency).send_all(digests, subject)),
+    ]
+    for label, server, send in cases:
+        before = (server.stats.connections, server.stats.messages)
+        elapsed, result = timed(send)
+        connections = server.stats.connections - before[0]
+        messages = server.stats.messages - before[1]
+        assert messages == len(digests), (label, messages)
+        if isinstance(result, dict):
+            assert result['failed'] == 0, result['errors'][:3]
+        print(f"{label:<22} {elapsed:8.2f} s   연결 {connections:>5,}개   메시지 {messages:>5,}건")
+
+    smtp_server.shutdown()
+    http_server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""
+원본 데이터 표 조건부 서식 벤치마크: 행 단위 Styler.apply(axis=1) (이전 방식) vs styling.py (axis=None)
+
+두 방식 모두 Styler가 실제로 스타일을 계산하도록(_compute) 한 뒤 시간을 재고,
+만들어진 셀 스타일이 같은지 확인합니다.
+
+사용법:
+    python bench_styling.py [--rows 50000] [--repeat 3]
+"""
+import argparse
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from styling import highlight_activity_rows, highlight_master_rows
+
+
+# -----------------------------------------------------------------
+# 이전 방식 (app.py에 있던 행 단위 함수)
+# -----------------------------------------------------------------
+
+def highlight_master_row(row, today, alert_days=30):
+    contract_end = row['Contract_End']
+    is_imminent = False
+    if pd.notnull(contract_end):
+        is_imminent = (contract_end.date() >= today.date()) and \
+                      (contract_end.date() <= (today + timedelta(days=alert_days)).date())
+
+    if is_imminent:
+        return ['background-color: #ffd70040'] * len(row)
+    return [''] * len(row)
+
+
+def highlight_activity_row(row, today):
+    due_date = row['Due_Date']
+    status = row['Status']
+
+    is_overdue = False
+    if pd.notnull(due_date):
+        # 알림 규칙(activity_overdue)과 같이, 오늘 마감인 활동도 Planned가 아니면 지연으로 봅니다.
+        is_overdue = ((due_date.date() < today.date()) or (due_date.date() == today.date() and status != 'Planned')) \
+            and (status != 'Done')
+
+    if is_overdue:
+        return ['background-color: #ff4c4c40'] * len(row)
+    return [''] * len(row)
+
+
+def make_frames(n_activities, seed=0):
+    rng = np.random.default_rng(seed)
+    n_kols = max(n_activities // 40, 1)
+    start = pd.Timestamp.now().normalize() - pd.Timedelta(days=365)
+
+    def dates(n):
+        values = start + pd.to_timedelta(rng.integers(0, 730, n), 'D')
+        return values.where(rng.random(n) > 0.01)  # 1%는 빈 날짜
+
+    master = pd.DataFrame({
+        'Kol_ID': np.arange(1, n_kols + 1, dtype='int32'),
+        'Name': [f"KOL {i}" for i in range(1, n_kols + 1)],
+        'Contract_End': dates(n_kols),
+        'Budget (USD)': rng.integers(1_000, 50_000, n_kols).astype('float64'),
+    })
+    activities = pd.DataFrame({
+        'Activity_ID': np.arange(1, n_activities + 1, dtype='int32'),
+        'Kol_ID': rng.integers(1, n_kols + 1, n_activities).astype('int32'),
+        'Activity_Type': pd.Categorical(rng.choice(['Lecture', 'Advisory', 'Post', 'Video'], n_activities)),
+        'Due_Date': dates(n_activities),
+        'Status': pd.Categorical(rng.choice(['Planned', 'Done', 'Delayed'], n_activities)),
+    })
+    return master, activities
+
+
+def styled_cells(df, func, today, axis, repeat):
+    best, ctx = float('inf'), None
+    for _ in range(repeat):
+        styler = df.style.apply(func, today=today, axis=axis)
+        start = time.perf_counter()
+        styler._compute()
+        best = min(best, time.perf_counter() - start)
+        ctx = dict(styler.ctx)
+    return best, ctx
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=50_000, help="활동 행 수 (KOL은 1/40)")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    today = datetime.now()
+    master, activities = make_frames(args.rows)
+    print(f"KOL {len(master):,}행 / 활동 {len(activities):,}행\n")
+
+    for name, df, legacy, vector in (
+        ('master', master, highlight_master_row, highlight_master_rows),
+        ('activities', activities, highlight_activity_row, highlight_activity_rows),
+    ):
+        legacy_time, legacy_ctx = styled_cells(df, legacy, today, 1, args.repeat)
+        vector_time, vector_ctx = styled_cells(df, vector, today, None, args.repeat)
+        assert legacy_ctx == vector_ctx, f"{name}: 스타일 결과가 다릅니다."
+        print(f"{name:>10}: 행 단위 {legacy_time * 1000:9.1f} ms → 벡터 {vector_time * 1000:7.1f} ms ({legacy_time / vector_time:.0f}x)")
+
+    print("\n두 방식의 셀 스타일이 동일합니다.")
+
+
+if __name__ == '__main__':
+    main()
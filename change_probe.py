@@ -0,0 +1,83 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+# --- 설정값 ---
+# Drive 메타데이터(modifiedTime)를 읽을 수 없을 때 대신 확인할 작은 범위 (예: "'KOL_Master'!Z1").
+# 시트의 onEdit 스크립트가 갱신하는 타임스탬프 셀 같은 '변경 표시' 범위를 지정합니다. 비어 있으면 사용하지 않습니다.
+CHANGE_MARKER_RANGE = os.environ.get('KOL_CHANGE_MARKER_RANGE', '')
+
+# --- 프로브 통계 (프로세스 전체) ---
+_stats_lock = threading.Lock()
+PROBE_STATS = {
+    'probes': 0,      # 프로브 호출 수
+    'unchanged': 0,   # 변경 없음으로 판단되어 전체 로드를 생략한 횟수
+    'failed': 0,      # 토큰을 얻지 못해 전체 로드로 진행한 횟수
+}
+
+
+def _count(key):
+    with _stats_lock:
+        PROBE_STATS[key] += 1
+
+
+def get_probe_stats():
+    """프로브 카운터 사본과 적중률(hit_ratio, 0~1)을 반환합니다."""
+    with _stats_lock:
+        stats = dict(PROBE_STATS)
+    stats['hit_ratio'] = stats['unchanged'] / stats['probes'] if stats['probes'] else 0.0
+    return stats
+
+
+def probe_token(sh, marker_range=CHANGE_MARKER_RANGE):
+    """
+    스프레드시트 내용이 바뀌었는지 판단할 변경 토큰을 가벼운 API 호출 1회로 가져옵니다.
+
+    1순위: Drive 메타데이터의 modifiedTime
+    2순위: marker_range 값의 해시 (Drive API를 쓸 수 없는 경우)
+    둘 다 실패하면 None을 반환합니다 (호출하는 쪽은 전체 로드를 해야 합니다).
+    """
+    _count('probes')
+    try:
+        return f"modified:{sh.get_lastUpdateTime()}"
+    except Exception as e:
+        logger.info("modifiedTime 조회 실패: %s", e)
+
+    if marker_range:
+        try:
+            values = sh.values_get(marker_range).get('values', [])
+            digest = hashlib.sha1(json.dumps(values, ensure_ascii=False).encode('utf-8')).hexdigest()
+            return f"marker:{digest}"
+        except Exception as e:
+            logger.info("변경 표시 범위 조회 실패: %s", e)
+
+    _count('failed')
+    return None
+
+
+def file_token(paths):
+    """로컬 파일(CSV/XLSX/Parquet/SQLite)의 수정 시각과 크기로 변경 토큰을 만듭니다. 파일이 없으면 None."""
+    _count('probes')
+    parts = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        parts.append(f"{os.path.abspath(path)}:{stat.st_mtime_ns}:{stat.st_size}")
+    if not parts:
+        _count('failed')
+        return None
+    return "file:" + hashlib.sha1("|".join(parts).encode('utf-8')).hexdigest()
+
+
+def is_unchanged(token, known_token):
+    """이번 토큰이 마지막 전체 로드 때의 토큰과 같으면 True (적중으로 기록)."""
+    unchanged = token is not None and token == known_token
+    if unchanged:
+        _count('unchanged')
+    return unchanged
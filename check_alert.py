@@ -0,0 +1,123 @@
+"""
+alert.py 점검: 오늘 기준으로 만든 작은 로컬 파일 소스(KOL_DATA_SOURCE=file:)로 alert.py를 실행하고
+종료 코드와 출력을 확인합니다. 발송 채널은 print로 고정하고, 알림 상태 저장소는 임시 디렉터리에 만듭니다.
+
+- 알림이 하나도 없는 날 / 일부 규칙만 비어 있는 날에도 정상 종료하는지 (상태 저장소 사용 / 미사용)
+- 오늘 마감인 활동: Planned는 마감 임박(D-0)으로만, Delayed 등 나머지 미완료 상태는 지연(D+0)으로 알리는지
+- 상태 저장소: 계약 만료일이 지나면 기한 경과, 마감이 지난 활동은 지연 규칙으로 이동, 완료/갱신만 해결로 표시하는지
+
+사용법:
+    python check_alert.py
+"""
+import os
+import subprocess
+import sys
+import tempfile
+
+import pandas as pd
+
+ALERT_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'alert.py')
+ALL_CLEAR = "🎉 모든 일정이 정상입니다."
+
+
+def write_source(directory, kols, activities):
+    """
+    directory에 KOL_Master.csv / Activities.csv를 씁니다. 날짜는 오늘부터의 일수로 지정합니다.
+    kols: [(Kol_ID, 계약 만료까지 일수)], activities: [(Activity_ID, Kol_ID, 마감까지 일수, Status)]
+    """
+    today = pd.Timestamp.now().normalize()
+
+    def day(offset):
+        return (today + pd.Timedelta(days=offset)).strftime('%Y-%m-%d')
+
+    pd.DataFrame({
+        'Kol_ID': [kol_id for kol_id, _ in kols],
+        'Name': [f"KOL {kol_id}" for kol_id, _ in kols],
+        'Country': 'KR',
+        'KOL_Type': 'Local',
+        'Contract_End': [day(offset) for _, offset in kols],
+        'Budget (USD)': 1000.0,
+        'Spent (USD)': 500.0,
+        'Status': 'Active',
+    }).to_csv(os.path.join(directory, 'KOL_Master.csv'), index=False)
+    pd.DataFrame({
+        'Activity_ID': [row[0] for row in activities],
+        'Kol_ID': [row[1] for row in activities],
+        'Activity_Type': 'Post',
+        'Due_Date': [day(row[2]) for row in activities],
+        'Status': [row[3] for row in activities],
+    }).to_csv(os.path.join(directory, 'Activities.csv'), index=False)
+
+
+def run_alert(source_dir, state_path):
+    """alert.py를 실행하고 출력을 반환합니다. 종료 코드가 0이 아니면 AssertionError."""
+    env = dict(os.environ, KOL_DATA_SOURCE=f"file:{source_dir}", KOL_ALERT_STATE_PATH=state_path, KOL_ALERT_CHANNEL='print')
+    env.pop('KOL_ALERT_TIERS', None)
+    result = subprocess.run([sys.executable, ALERT_SCRIPT], env=env, cwd=source_dir, capture_output=True, text=True)
+    assert result.returncode == 0, f"alert.py 종료 코드 {result.returncode}\n{result.stdout}\n{result.stderr}"
+    return result.stdout
+
+
+def check_empty_rules(workdir, state_path):
+    # 알림 없음: 계약은 구간 밖, 활동은 모두 완료
+    write_source(workdir, kols=[(1, 400), (2, -30)], activities=[(1, 1, 2, 'Done'), (2, 2, -5, 'Done')])
+    output = run_alert(workdir, state_path)
+    assert ALL_CLEAR in output and output.count("(해당 없음)") == 3, output
+
+    # 계약 만료 규칙만 결과가 있고 활동 규칙은 비어 있음
+    write_source(workdir, kols=[(1, 5), (2, 400)], activities=[(1, 1, 2, 'Done')])
+    output = run_alert(workdir, state_path)
+    assert "KOL 1 (KR) - 계약 만료" in output and output.count("(해당 없음)") == 2 and ALL_CLEAR not in output, output
+
+
+def lines_with(output, text):
+    return [line for line in output.splitlines() if text in line]
+
+
+def check_due_today(workdir):
+    kols = [(1, 400), (2, 400), (3, 400), (4, 400)]
+    activities = [(1, 1, 0, 'Planned'), (2, 2, 0, 'Delayed'), (3, 3, 0, 'In Progress'), (4, 4, 0, 'Done')]
+    write_source(workdir, kols, activities)
+    output = run_alert(workdir, '')
+    assert [line.split(' - ')[1] for line in lines_with(output, "활동 마감")] == ["[D-0] KOL 1"], output
+    assert [line.split(' - ')[1] for line in lines_with(output, "활동 지연")] == ["[D+0] KOL 2", "[D+0] KOL 3"], output
+
+
+def check_state_changes(workdir, state_path):
+    kols = [(1, 5), (2, 10), (3, 400), (4, 400), (5, 400)]
+    activities = [(1, 3, 2, 'Planned'), (2, 4, 3, 'Planned'), (3, 5, 5, 'Planned')]
+    write_source(workdir, kols, activities)
+    output = run_alert(workdir, state_path)
+    assert "새 알림 5건" in output, output
+
+    # KOL 1 계약은 만료일이 지남, KOL 2 계약은 갱신 / 활동 1은 마감이 지남, 활동 2는 완료, 활동 3은 그대로
+    kols[0], kols[1] = (1, -1), (2, 400)
+    activities[0], activities[1] = (1, 3, -1, 'Planned'), (2, 4, 3, 'Done')
+    write_source(workdir, kols, activities)
+    output = run_alert(workdir, state_path)
+    assert lines_with(output, "KOL 1 (KR) - 계약 만료")[0].endswith("⌛ 기한 경과"), output
+    assert lines_with(output, "KOL 2 (KR) - 계약 만료")[0].endswith("✅ 해결"), output
+    assert lines_with(output, "KOL 4 - 활동 마감")[0].endswith("✅ 해결"), output
+    assert not lines_with(output, "KOL 3 - 활동 마감"), output  # 지연으로 이동 (해결 아님)
+    assert lines_with(output, "KOL 3 - 활동 지연") and "(다른 알림으로 이동 1건)" in output, output
+    assert len(lines_with(output, "✅ 해결")) == 2 and "(이미 알린 1건 생략)" in output, output
+
+    # 같은 데이터로 다시 실행하면 바뀐 알림이 없습니다.
+    output = run_alert(workdir, state_path)
+    assert "새 알림 0건 / 단계 상향 0건 / 해결 0건 / 기한 경과 0건 / 이동 0건 / 이미 알림 2건" in output, output
+
+
+def main():
+    with tempfile.TemporaryDirectory() as workdir:
+        for label, state_path in [('상태 저장소 미사용', ''), ('상태 저장소 사용', os.path.join(workdir, 'state.sqlite'))]:
+            check_empty_rules(workdir, state_path)
+            print(f"✅ 빈 규칙 ({label})")
+        check_due_today(workdir)
+        print("✅ 오늘 마감인 활동 (Planned / 그 외 상태)")
+        check_state_changes(workdir, os.path.join(workdir, 'state_changes.sqlite'))
+        print("✅ 상태 저장소: 해결 / 기한 경과 / 이동 구분")
+    print("\nalert.py 점검 통과")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""
+증분 동기화(DeltaSync) + 스냅샷 점검: 로컬 파일 소스로 로드 → 재시작(스냅샷에서 복원) → 원본 변경을 반영하고,
+증분 결과가 같은 원본의 전체 재계산과 같은지, 데이터 버전과 디스크 스냅샷이 새 내용을 가리키는지 확인합니다.
+
+- 재시작 후 활동 삭제만 있는 변경: 데이터 버전이 바뀌고, 다음 재시작에서 삭제된 행이 돌아오지 않는지
+- 자유 텍스트 컬럼 몇 칸만 바뀐 변경: 증분 결과의 컬럼 표현(dtype)이 전체 재계산과 같은지 (압축 표현 모드)
+
+사용법:
+    python check_delta_sync.py
+"""
+import os
+import tempfile
+
+# 재시작 직후 경로(유효 시간이 지난 스냅샷 + 변경 프로브)를 타도록 스냅샷 유효 시간을 0으로 둡니다.
+os.environ['KOL_SNAPSHOT_MAX_AGE'] = '0'
+
+import numpy as np
+import pandas as pd
+
+from data_sources import FileSource, load_dataset
+from kol_data import DeltaSync, dataset_version
+
+
+class SnapshotFileSource(FileSource):
+    """스냅샷 디렉터리를 쓰는 파일 소스 (GSheetSource처럼 스냅샷 → 변경 프로브 → 로드 순서를 탑니다)."""
+
+    def __init__(self, path, snapshot_dir):
+        super().__init__(path)
+        self.snapshot_dir = snapshot_dir
+
+
+def write_source(directory, master, activities):
+    master.to_csv(os.path.join(directory, 'KOL_Master.csv'), index=False)
+    activities.to_csv(os.path.join(directory, 'Activities.csv'), index=False)
+    # 파일 변경 토큰(mtime)이 바뀌도록 수정 시각을 앞으로 옮깁니다.
+    for name in ('KOL_Master.csv', 'Activities.csv'):
+        path = os.path.join(directory, name)
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def make_frames(n_kols=40, n_activities=600, seed=0):
+    rng = np.random.default_rng(seed)
+    master = pd.DataFrame({
+        'Kol_ID': np.arange(1, n_kols + 1),
+        'Name': [f"KOL {i}" for i in range(1, n_kols + 1)],
+        'Country': rng.choice(['KR', 'US', 'JP'], n_kols),
+        'KOL_Type': rng.choice(['Global', 'Local'], n_kols),
+        'Contract_End': (pd.Timestamp('2026-01-01') + pd.to_timedelta(rng.integers(0, 730, n_kols), 'D')).strftime('%Y-%m-%d'),
+        'Budget (USD)': rng.integers(1_000, 50_000, n_kols),
+        'Spent (USD)': rng.integers(0, 60_000, n_kols),
+        'Status': 'Active',
+    })
+    activities = pd.DataFrame({
+        'Activity_ID': np.arange(1, n_activities + 1),
+        'Kol_ID': rng.integers(1, n_kols + 1, n_activities),
+        'Activity_Type': rng.choice(['Lecture', 'Post', 'Video'], n_activities),
+        'Due_Date': (pd.Timestamp('2026-01-01') + pd.to_timedelta(rng.integers(0, 730, n_activities), 'D')).strftime('%Y-%m-%d'),
+        'Status': rng.choice(['Planned', 'Delayed', 'Done'], n_activities),
+    })
+    return master, activities
+
+
+def assert_same_as_full(source_dir, master_df, activities_df):
+    """증분 결과가 같은 원본을 처음부터 계산한 결과와 같은지 확인합니다."""
+    full_master, full_activities, _ = load_dataset(FileSource(source_dir), DeltaSync())
+    pd.testing.assert_frame_equal(master_df, full_master, check_categorical=False)
+    pd.testing.assert_frame_equal(activities_df, full_activities, check_categorical=False)
+
+
+def check_restore_then_delete(workdir):
+    source_dir, snapshot_dir = os.path.join(workdir, 'source'), os.path.join(workdir, 'snapshot')
+    os.makedirs(source_dir)
+    master, activities = make_frames()
+    write_source(source_dir, master, activities)
+    load_dataset(SnapshotFileSource(source_dir, snapshot_dir), DeltaSync())
+
+    # 재시작: 스냅샷에서 복원한 뒤 활동 3건 삭제만 반영
+    delta_sync = DeltaSync()
+    load_dataset(SnapshotFileSource(source_dir, snapshot_dir), delta_sync)
+    write_source(source_dir, master, activities.iloc[3:])
+    master_df, activities_df, _ = load_dataset(SnapshotFileSource(source_dir, snapshot_dir), delta_sync)
+    assert delta_sync.last_stats['mode'] == 'delta', delta_sync.last_stats
+    assert len(activities_df) == len(activities) - 3, len(activities_df)
+    assert delta_sync.data_version == dataset_version(master_df, activities_df), delta_sync.data_version
+    assert_same_as_full(source_dir, master_df, activities_df)
+
+    # 한 번 더 재시작: 스냅샷이 삭제 후 내용이어야 합니다.
+    _, restarted_activities, _ = load_dataset(SnapshotFileSource(source_dir, snapshot_dir), DeltaSync())
+    assert len(restarted_activities) == len(activities) - 3, len(restarted_activities)
+
+
+def check_text_edit(workdir):
+    source_dir = os.path.join(workdir, 'text_source')
+    os.makedirs(source_dir)
+    master, activities = make_frames()
+    activities['Memo'] = [f"메모 {i}" for i in activities['Activity_ID']]  # 값이 모두 다른 자유 텍스트
+    write_source(source_dir, master, activities)
+    delta_sync = DeltaSync()
+    load_dataset(FileSource(source_dir), delta_sync)
+
+    # 두 칸을 같은 값으로 수정: 바뀐 두 행만 보면 반복되는 값이라 category로 고를 수 있는 경우
+    activities.loc[[5, 9], 'Memo'] = "수정됨"
+    write_source(source_dir, master, activities)
+    master_df, activities_df, _ = load_dataset(FileSource(source_dir), delta_sync)
+    assert delta_sync.last_stats['mode'] == 'delta', delta_sync.last_stats
+    assert_same_as_full(source_dir, master_df, activities_df)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as workdir:
+        check_restore_then_delete(workdir)
+        print("✅ 재시작 후 삭제만 있는 증분")
+        check_text_edit(workdir)
+        print("✅ 자유 텍스트 컬럼 일부 수정 증분")
+    print("\n증분 동기화 점검 통과")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,222 @@
+import contextlib
+import os
+import sqlite3
+
+import pandas as pd
+
+from change_probe import file_token, is_unchanged, probe_token
+from kol_data import SPREADSHEET_NAME, WORKSHEET1_NAME, WORKSHEET2_NAME, fetch_raw_frames_batch, open_spreadsheet
+from sheets_quota import track_api_usage
+from singleflight import SingleFlight
+from snapshot import SNAPSHOT_DIR, read_snapshot, read_sync_state, write_snapshot
+
+# -----------------------------------------------------------------
+# 데이터 소스(백엔드)
+#   모든 소스는 두 원본 프레임(KOL_Master, Activities)을 돌려주고,
+#   타입 변환/파생 지표 계산은 load_dataset()에서 공통으로 처리합니다.
+#
+#   KOL_DATA_SOURCE 환경 변수로 선택합니다.
+#     gsheet                  : Google Sheets (기본값)
+#     file:<경로>             : 디렉터리(KOL_Master.csv/.xlsx/.parquet + Activities.*) 또는 두 시트가 있는 .xlsx 파일
+#     sqlite:<경로>           : KOL_Master, Activities 테이블이 있는 SQLite DB
+# -----------------------------------------------------------------
+FILE_EXTENSIONS = ('.parquet', '.csv', '.xlsx')
+
+
+class DataSource:
+    """데이터 소스 공통 인터페이스."""
+
+    name = ''
+    snapshot_dir = None  # 로컬 스냅샷을 사용할 디렉터리 (None이면 사용하지 않음)
+
+    @property
+    def key(self):
+        """같은 원본을 가리키는 소스끼리 같은 값을 갖는 식별자 (동시 로드 병합에 사용)."""
+        return self.name
+
+    def probe_token(self):
+        """내용이 바뀌었는지 비교할 변경 토큰을 반환합니다. 알 수 없으면 None."""
+        return None
+
+    def fetch_raw(self):
+        """(master_raw, activities_raw) 원본 프레임을 반환합니다."""
+        raise NotImplementedError
+
+
+class GSheetSource(DataSource):
+    """Google Sheets ('KOL 관리 시트') 소스. get_client는 gspread 클라이언트(또는 None)를 돌려주는 함수입니다."""
+
+    name = 'gsheet'
+    snapshot_dir = SNAPSHOT_DIR
+
+    def __init__(self, get_client):
+        self._get_client = get_client
+
+    @property
+    def key(self):
+        return f"gsheet:{SPREADSHEET_NAME}"
+
+    def _spreadsheet(self):
+        gc = self._get_client()
+        if gc is None:
+            raise RuntimeError("인증 실패: 'google_credentials.json' 파일을 찾거나 Streamlit 'Secrets' 설정을 확인하세요.")
+        return open_spreadsheet(gc)
+
+    def probe_token(self):
+        return probe_token(self._spreadsheet())
+
+    def fetch_raw(self):
+        return fetch_raw_frames_batch(self._spreadsheet())
+
+
+def _read_table_file(path, sheet_name=None):
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path)
+    if path.endswith('.csv'):
+        return pd.read_csv(path)
+    return pd.read_excel(path, sheet_name=sheet_name or 0)  # openpyxl 필요
+
+
+class FileSource(DataSource):
+    """로컬 추출 파일 소스 (CSV / XLSX / Parquet)."""
+
+    name = 'file'
+
+    def __init__(self, path):
+        self.path = path
+        if os.path.isdir(path):
+            self._files = [self._find(WORKSHEET1_NAME), self._find(WORKSHEET2_NAME)]
+        elif path.endswith('.xlsx'):
+            self._files = [path]
+        else:
+            raise ValueError(f"지원하지 않는 파일 소스입니다: {path} (디렉터리 또는 .xlsx)")
+
+    @property
+    def key(self):
+        return f"file:{os.path.abspath(self.path)}"
+
+    def _find(self, table_name):
+        for ext in FILE_EXTENSIONS:
+            candidate = os.path.join(self.path, table_name + ext)
+            if os.path.exists(candidate):
+                return candidate
+        raise FileNotFoundError(f"{self.path}에서 {table_name}{FILE_EXTENSIONS} 파일을 찾을 수 없습니다.")
+
+    def probe_token(self):
+        return file_token(self._files)
+
+    def fetch_raw(self):
+        if len(self._files) == 1:
+            master_raw = _read_table_file(self.path, WORKSHEET1_NAME)
+            activities_raw = _read_table_file(self.path, WORKSHEET2_NAME)
+        else:
+            master_raw, activities_raw = (_read_table_file(f) for f in self._files)
+        return master_raw.dropna(how='all'), activities_raw.dropna(how='all')
+
+
+class SQLiteSource(DataSource):
+    """SQLite 소스 (KOL_Master, Activities 테이블)."""
+
+    name = 'sqlite'
+
+    def __init__(self, path):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"SQLite 파일을 찾을 수 없습니다: {path}")
+        self.path = path
+
+    @property
+    def key(self):
+        return f"sqlite:{os.path.abspath(self.path)}"
+
+    def probe_token(self):
+        return file_token([self.path, self.path + '-wal'])
+
+    def fetch_raw(self):
+        # sqlite3 연결의 with 문은 커밋/롤백만 하고 연결을 닫지 않으므로 closing으로 감쌉니다.
+        with contextlib.closing(sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)) as conn:
+            master_raw = pd.read_sql_query(f'SELECT * FROM "{WORKSHEET1_NAME}"', conn)
+            activities_raw = pd.read_sql_query(f'SELECT * FROM "{WORKSHEET2_NAME}"', conn)
+        return master_raw.dropna(how='all'), activities_raw.dropna(how='all')
+
+
+def make_source(spec, get_client=None):
+    """'gsheet', 'file:<경로>', 'sqlite:<경로>' 형식의 설정 문자열로 데이터 소스를 만듭니다."""
+    kind, _, target = spec.partition(':')
+    if kind == 'gsheet':
+        return GSheetSource(get_client)
+    if kind == 'file':
+        return FileSource(target)
+    if kind == 'sqlite':
+        return SQLiteSource(target)
+    raise ValueError(f"알 수 없는 데이터 소스: {spec}")
+
+
+def source_from_env(get_client=None):
+    """KOL_DATA_SOURCE 환경 변수(기본값 'gsheet')로 데이터 소스를 만듭니다."""
+    return make_source(os.environ.get('KOL_DATA_SOURCE', 'gsheet'), get_client)
+
+
+# -----------------------------------------------------------------
+# 공통 로더: 스냅샷 → 변경 프로브 → 원본 로드 → 타입 변환/파생 지표 (DeltaSync)
+# -----------------------------------------------------------------
+
+# 같은 원본에 대한 로드는 프로세스 안에서 한 번에 하나만 실행하고, 동시에 들어온 요청은 그 결과를 공유합니다.
+LOAD_FLIGHTS = SingleFlight()
+
+
+def load_dataset(source, delta_sync):
+    """
+    source에서 데이터를 가져와 (master_df, activities_df, 메시지)를 반환합니다.
+    Streamlit UI 함수를 사용하지 않으므로 백그라운드 스레드나 alert.py에서도 호출할 수 있고, 실패 시 예외를 던집니다.
+    같은 source.key의 로드가 이미 진행 중이면 새로 호출하지 않고 그 결과를 기다려 함께 받습니다.
+    이번 로드의 API 호출/재시도/대기 시간은 sheets_quota.get_last_load_usage()로 확인할 수 있습니다.
+    """
+    return LOAD_FLIGHTS.do(source.key, _load_tracked, source, delta_sync)
+
+
+def _load_tracked(source, delta_sync):
+    with track_api_usage() as usage:
+        master_df, activities_df, message = _load_dataset(source, delta_sync)
+    if usage['retries']:
+        message += f" (API 재시도 {usage['retries']}회, 대기 {usage['backoff_wait'] + usage['throttle_wait']:.1f}초)"
+    return master_df, activities_df, message
+
+
+def _load_dataset(source, delta_sync):
+    snapshot_dir = source.snapshot_dir
+
+    # --- 로컬 스냅샷 (유효 시간 이내면 원본 호출 없이 바로 사용) ---
+    if snapshot_dir is not None:
+        snapshot = read_snapshot(snapshot_dir=snapshot_dir)
+        if snapshot is not None:
+            master_df, activities_df, _ = snapshot
+            return master_df, activities_df, "🎉 로컬 스냅샷에서 데이터 로드 완료!"
+
+    # --- 변경 여부 확인 (가벼운 메타데이터 조회 1회) ---
+    token = source.probe_token()
+    if delta_sync.current() is None and snapshot_dir is not None:
+        # 재시작 직후에는 지난 스냅샷으로 DeltaSync를 채웁니다. 스냅샷에 기록된 토큰과 비교하고, 다음 변경은 증분으로 반영합니다.
+        stale = read_snapshot(max_age=None, snapshot_dir=snapshot_dir)
+        if stale is not None:
+            delta_sync.restore(stale[0], stale[1], stale[2].get('source_token'), read_sync_state(stale[2], snapshot_dir))
+    previous = delta_sync.current()
+    if previous is not None and is_unchanged(token, previous[2]):
+        master_df, activities_df, _ = previous
+        if snapshot_dir is not None:
+            write_snapshot(master_df, activities_df, source_token=token, snapshot_dir=snapshot_dir,
+                           sync_state=delta_sync.sync_state())  # 저장 시각만 갱신
+        return master_df, activities_df, "✅ 원본 변경 없음 - 기존 데이터를 그대로 사용합니다."
+
+    # --- 데이터 로드 ---
+    master_raw, activities_raw = source.fetch_raw()
+
+    # --- 데이터 타입 변환 및 계산 (이전 데이터 대비 변경된 행만 반영) ---
+    master_df, activities_df = delta_sync.apply(master_raw, activities_raw, source_token=token)
+    if snapshot_dir is not None:
+        write_snapshot(master_df, activities_df, source_token=token, snapshot_dir=snapshot_dir, sync_state=delta_sync.sync_state())
+
+    stats = delta_sync.last_stats
+    if stats['mode'] == 'delta':
+        changed = stats['activities_added'] + stats['activities_changed'] + stats['activities_deleted']
+        return master_df, activities_df, f"🎉 데이터 증분 동기화 완료! (활동 변경 {changed}건, KOL 재계산 {stats['kols_recomputed']}명)"
+    return master_df, activities_df, f"🎉 데이터 로드 및 초기 계산 완료! ({source.name})"
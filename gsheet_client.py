@@ -0,0 +1,61 @@
+import threading
+
+import gspread
+from requests.adapters import HTTPAdapter
+
+from sheets_quota import QuotaHTTPClient
+
+# --- 설정값 ---
+# 세션당 유지할 keep-alive 연결 수 (동시에 여러 Streamlit 세션이 같은 클라이언트를 씁니다)
+HTTP_POOL_CONNECTIONS = 4
+HTTP_POOL_MAXSIZE = 16
+
+# --- 인증 통계 (프로세스 전체) ---
+_stats_lock = threading.Lock()
+AUTH_STATS = {
+    'clients_created': 0,   # 인증 정보 읽기 + 클라이언트 생성 횟수
+    'token_refreshes': 0,   # JWT 서명 + 토큰 교환이 실제로 일어난 횟수
+}
+
+
+def _count(key):
+    with _stats_lock:
+        AUTH_STATS[key] += 1
+
+
+def get_auth_stats():
+    """인증 관련 카운터의 사본을 반환합니다."""
+    with _stats_lock:
+        return dict(AUTH_STATS)
+
+
+def create_client(creds_path=None, creds_info=None):
+    """
+    서비스 계정으로 gspread 클라이언트를 만듭니다. (creds_path 또는 creds_info 중 하나 필요)
+
+    - 액세스 토큰은 요청 시점에 만료되었을 때만 자동으로 갱신됩니다 (google-auth AuthorizedSession).
+    - HTTP 세션은 keep-alive 연결 풀을 사용하므로, 클라이언트를 재사용하면 TLS 핸드셰이크도 생략됩니다.
+    - 모든 요청은 QuotaHTTPClient를 거치므로 공유 한도(토큰 버킷)와 429/5xx 재시도가 적용됩니다.
+    호출하는 쪽에서 이 클라이언트를 프로세스 단위로 캐시해서 재사용해야 효과가 있습니다.
+    """
+    if creds_path is not None:
+        gc = gspread.service_account(filename=creds_path, http_client=QuotaHTTPClient)
+    elif creds_info is not None:
+        gc = gspread.service_account_from_dict(dict(creds_info), http_client=QuotaHTTPClient)
+    else:
+        raise ValueError("creds_path 또는 creds_info 중 하나가 필요합니다.")
+    _count('clients_created')
+
+    http = gc.http_client
+    http.session.mount('https://', HTTPAdapter(pool_connections=HTTP_POOL_CONNECTIONS, pool_maxsize=HTTP_POOL_MAXSIZE))
+
+    # 토큰 갱신 횟수를 세기 위해 credentials.refresh를 감쌉니다.
+    credentials = http.auth
+    original_refresh = credentials.refresh
+
+    def counting_refresh(request):
+        _count('token_refreshes')
+        return original_refresh(request)
+
+    credentials.refresh = counting_refresh
+    return gc
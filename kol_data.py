@@ -0,0 +1,355 @@
+import os
+import re
+import threading
+
+import pandas as pd
+from gspread_dataframe import get_as_dataframe
+from pandas.io.parsers import TextParser
+
+from metrics import completion_counts, done_flag, rates_from_counts, utilization_rate
+from time_buckets import date_keys
+from schema import ACTIVITIES_SCHEMA, MASTER_SCHEMA, compact_text, concat_frames, match_text_dtypes, memory_report, parse_frame
+
+# --- 설정값 ---
+SPREADSHEET_NAME = "KOL 관리 시트"
+WORKSHEET1_NAME = "KOL_Master"
+WORKSHEET2_NAME = "Activities"
+
+MASTER_KEY = 'Kol_ID'
+DATA_VERSION_ATTR = 'data_version'  # DataFrame.attrs에 기록하는 데이터 버전 키
+ACTIVITY_KEY = 'Activity_ID'
+
+# 압축 표현 모드 (기본값: 켜짐)
+#   스키마에 없는 문자열 컬럼은 Arrow 문자열/category로, Due_Month는 Int16으로 저장하고,
+#   Status에서 바로 계산할 수 있는 보조 컬럼(Done)은 만들지 않습니다.
+COMPACT_FRAMES = os.environ.get('KOL_COMPACT_FRAMES', '1') == '1'
+
+# get_as_dataframe()와 동일한 값 표현 옵션 (수식은 원문, 날짜는 표시 문자열)
+VALUE_RENDER_PARAMS = {'valueRenderOption': 'FORMULA', 'dateTimeRenderOption': 'FORMATTED_STRING'}
+UNNAMED_COLUMN_PATTERN = re.compile(r'^Unnamed:\s\d+$')
+
+
+# -----------------------------------------------------------------
+# 1. 원본 데이터 로드
+# -----------------------------------------------------------------
+
+def _quote_sheet_title(title):
+    return "'" + title.replace("'", "''") + "'"
+
+
+def frame_from_values(values):
+    """
+    Sheets API의 값 배열(첫 행이 헤더)을 get_as_dataframe()과 같은 규칙으로 DataFrame으로 만듭니다.
+    (빈 행 제거, 헤더가 없는 빈 컬럼 제거, 타입 추론은 TextParser 사용)
+    """
+    if not values:
+        return pd.DataFrame()
+    width = max(len(row) for row in values)
+    rows = [list(row) + [''] * (width - len(row)) for row in values]
+    df = TextParser(rows).read().dropna(how='all')
+    empty_unnamed = [
+        col for col in df.columns
+        if UNNAMED_COLUMN_PATTERN.match(str(col)) and df[col].isna().all()
+    ]
+    return df.drop(columns=empty_unnamed)
+
+
+def fetch_raw_frames_batch(sh):
+    """두 워크시트의 값을 values_batch_get 한 번의 호출로 가져와 원본 DataFrame으로 만듭니다."""
+    data = sh.values_batch_get(
+        [_quote_sheet_title(WORKSHEET1_NAME), _quote_sheet_title(WORKSHEET2_NAME)],
+        params=VALUE_RENDER_PARAMS,
+    )
+    value_ranges = data.get('valueRanges', [])
+    master_raw, activities_raw = (frame_from_values(vr.get('values', [])) for vr in value_ranges)
+    return master_raw, activities_raw
+
+
+def fetch_raw_frames_per_sheet(sh):
+    """(이전 방식) 워크시트마다 메타데이터 조회 + get_as_dataframe()으로 가져옵니다. 비교/벤치마크용."""
+    master_raw = get_as_dataframe(sh.worksheet(WORKSHEET1_NAME)).dropna(how='all')
+    activities_raw = get_as_dataframe(sh.worksheet(WORKSHEET2_NAME)).dropna(how='all')
+    return master_raw, activities_raw
+
+
+_spreadsheets = {}
+_spreadsheets_lock = threading.Lock()
+
+
+def open_spreadsheet(gc):
+    """
+    스프레드시트를 열어 클라이언트별로 재사용합니다.
+    gc.open()은 Drive 검색 + 메타데이터 조회로 왕복 2회가 들기 때문에, 매 로드마다 다시 열지 않습니다.
+    """
+    with _spreadsheets_lock:
+        sh = _spreadsheets.get(id(gc))
+        if sh is None or sh.client is not gc:
+            sh = _spreadsheets[id(gc)] = gc.open(SPREADSHEET_NAME)
+        return sh
+
+
+def dataset_version(master_df, activities_df):
+    """두 프레임의 내용으로부터 데이터 버전(16자리 hex 문자열)을 계산합니다."""
+    digest = 0
+    for df in (master_df, activities_df):
+        hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+        # 행 순서와 행 수를 모두 반영하도록 위치 가중치를 곱해 합산합니다 (uint64 overflow는 의도된 동작).
+        weights = (pd.RangeIndex(1, len(hashes) + 1).to_numpy().astype('uint64') * 0x9E3779B97F4A7C15)
+        digest = (digest * 31 + int((hashes * weights).sum()) + len(hashes)) & 0xFFFFFFFFFFFFFFFF
+    return f"{digest:016x}"
+
+
+def get_data_version(master_df, activities_df):
+    """
+    데이터 버전을 반환합니다. 로드 시 frame.attrs에 기록해 둔 값이 있으면 그대로 쓰고,
+    없으면 내용 해시로 계산해 기록합니다 (rerun마다 전체 해시를 다시 계산하지 않기 위함).
+    """
+    version = master_df.attrs.get(DATA_VERSION_ATTR)
+    if version is None or activities_df.attrs.get(DATA_VERSION_ATTR) != version:
+        version = dataset_version(master_df, activities_df)
+        master_df.attrs[DATA_VERSION_ATTR] = activities_df.attrs[DATA_VERSION_ATTR] = version
+    return version
+
+
+# -----------------------------------------------------------------
+# 2. 파생 컬럼 계산
+# -----------------------------------------------------------------
+
+def _compact(df, schema, like):
+    """압축 표현: 전체 로드는 compact_text로 고르고, 증분 반영(like = 기존 프레임)은 기존 컬럼 표현을 따릅니다."""
+    return compact_text(df, schema) if like is None else match_text_dtypes(df, like, schema)
+
+
+def prepare_master(master_df, like=None):
+    """KOL_Master 행을 스키마대로 변환하고 행 단위 파생 컬럼(Utilization_Rate)을 계산합니다. (like: 증분 반영 시 기존 프레임)"""
+    master_df = parse_frame(master_df, MASTER_SCHEMA)
+    master_df['Completion_Rate'] = 0.0  # 활동 데이터 기준으로 compute_derived / DeltaSync에서 채웁니다.
+    master_df['Utilization_Rate'] = utilization_rate(master_df['Spent (USD)'], master_df['Budget (USD)'])
+    if COMPACT_FRAMES:
+        master_df = _compact(master_df, MASTER_SCHEMA, like)
+    return master_df
+
+
+def prepare_activities(activities_df, like=None):
+    """
+    Activities 행을 스키마대로 변환하고 행 단위 파생 컬럼(Done, Due_Day, Due_Month)을 계산합니다. (압축 모드에서는 Done 없음)
+    like: 증분 반영 시 기존 프레임
+    """
+    activities_df = parse_frame(activities_df, ACTIVITIES_SCHEMA)
+    due_day, due_month = date_keys(activities_df['Due_Date'])  # 기간별 집계용 정수 키
+    if COMPACT_FRAMES:
+        # 월 번호는 Int16으로 충분합니다 (1970-01부터 약 2700년). 완료 여부는 metrics가 Status에서 바로 계산합니다.
+        activities_df['Due_Day'], activities_df['Due_Month'] = due_day, due_month.astype('Int16')
+        return _compact(activities_df, ACTIVITIES_SCHEMA, like)
+    activities_df['Done'] = done_flag(activities_df['Status'])
+    activities_df['Due_Day'], activities_df['Due_Month'] = due_day, due_month
+    return activities_df
+
+
+def compute_derived(master_raw, activities_raw, counts=None):
+    """
+    원본 시트 데이터로부터 대시보드용 master_df, activities_df를 전체 계산합니다.
+    counts(dict)를 넘기면 Kol_ID별 Total/Done 카운터를 counts['summary']에 담아 돌려줍니다 (DeltaSync용).
+    """
+    master_df = prepare_master(master_raw)
+    activities_df = prepare_activities(activities_raw)
+    summary = completion_counts(activities_df)
+    master_df['Completion_Rate'] = master_df['Kol_ID'].map(rates_from_counts(summary)).fillna(0)
+    if counts is not None:
+        counts['summary'] = summary
+    return master_df, activities_df
+
+
+def update_counts(summary, removed, added):
+    """
+    Kol_ID별 Total/Done 카운터에서 removed 행(이전 값)을 빼고 added 행(새 값)을 더합니다.
+    (카운터, 카운터가 바뀐 Kol_ID)를 반환하며, 활동이 0건이 된 Kol_ID는 카운터에서 제거합니다.
+    """
+    delta = completion_counts(added).sub(completion_counts(removed), fill_value=0)
+    summary = summary.add(delta, fill_value=0).astype('int64')
+    return summary[summary['Total'] > 0], delta.index
+
+
+# -----------------------------------------------------------------
+# 3. 증분(Delta) 동기화
+# -----------------------------------------------------------------
+
+def _fingerprint(raw_df, key):
+    """행 단위 해시(fingerprint)를 key 값 인덱스로 반환합니다."""
+    fp = pd.util.hash_pandas_object(raw_df, index=False)
+    fp.index = pd.Index(raw_df[key].to_numpy())
+    return fp
+
+
+def _diff(old_fp, new_fp):
+    """이전/현재 fingerprint를 비교해 (추가, 변경, 삭제) key 목록을 반환합니다."""
+    common = new_fp.index.intersection(old_fp.index)
+    added = new_fp.index.difference(old_fp.index)
+    deleted = old_fp.index.difference(new_fp.index)
+    changed = common[new_fp.loc[common].to_numpy() != old_fp.loc[common].to_numpy()]
+    return added, changed, deleted
+
+
+def _keyed(df, key):
+    """key 컬럼 값을 (이름 없는) 인덱스로 갖는 프레임을 반환합니다. 데이터 버전 attrs는 떼어 냅니다 (내용이 바뀌면 틀린 값이 되므로)."""
+    df = df.copy()
+    df.index = pd.Index(df[key].to_numpy())
+    df.attrs = {}
+    return df
+
+
+def _has_valid_key(raw_df, key):
+    return key in raw_df.columns and raw_df[key].notna().all() and raw_df[key].is_unique
+
+
+class DeltaSync:
+    """
+    마지막으로 계산한 데이터셋을 보관하고, 새로 받은 시트 데이터와 비교하여
+    추가/변경/삭제된 행만 반영합니다.
+
+    - 행 비교는 원본 행의 fingerprint(해시)로 수행합니다.
+    - Kol_ID별 Total/Done 카운터를 보관하고 변경된 활동 행만큼 더하고 빼며,
+      Completion_Rate는 카운터가 바뀐 Kol_ID와 변경된 KOL만 다시 계산합니다.
+    - 컬럼 구성이 바뀌었거나 키(Kol_ID, Activity_ID)가 비어있거나 중복되면 전체 재계산합니다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._master = None
+        self._activities = None
+        self._master_fp = None
+        self._activities_fp = None
+        self._summary = None  # Kol_ID별 Total/Done 카운터 (metrics.completion_counts)
+        self._columns = None
+        self.source_token = None  # 마지막으로 반영한 데이터의 변경 토큰 (change_probe 참고)
+        self.data_version = None  # 마지막으로 반영한 데이터의 버전 (dataset_version)
+        self.last_stats = {}
+        self.memory_report = None  # 마지막 전체 로드 시 컬럼별 메모리 (변환 전/후)
+
+    def current(self):
+        """마지막으로 반영한 (master_df, activities_df, source_token)을 반환합니다. 없으면 None."""
+        with self._lock:
+            if self._master is None:
+                return None
+            master_df, activities_df = self._master.reset_index(drop=True), self._activities.reset_index(drop=True)
+            master_df.attrs[DATA_VERSION_ATTR] = activities_df.attrs[DATA_VERSION_ATTR] = self.data_version
+            return master_df, activities_df, self.source_token
+
+    def sync_state(self):
+        """
+        스냅샷에 함께 저장할 증분 동기화 상태 {'master_fp', 'activities_fp', 'columns', 'memory_report'}.
+        증분 반영을 할 수 없는 상태(키가 없거나 중복)면 None.
+        """
+        with self._lock:
+            if self._master_fp is None:
+                return None
+            return {
+                'master_fp': self._master_fp, 'activities_fp': self._activities_fp,
+                'columns': self._columns, 'memory_report': self.memory_report,
+            }
+
+    def restore(self, master_df, activities_df, source_token=None, state=None):
+        """
+        스냅샷에서 읽은 데이터셋으로 DeltaSync를 채웁니다 (재시작 직후용).
+        state(sync_state의 값)가 있으면 다음 변경을 증분으로 반영하고, 없으면 데이터셋만 보관했다가 다음 변경 때 전체 재계산합니다.
+        """
+        with self._lock:
+            if not (_has_valid_key(master_df, MASTER_KEY) and _has_valid_key(activities_df, ACTIVITY_KEY)):
+                return
+            self._master = _keyed(master_df, MASTER_KEY)
+            self._activities = _keyed(activities_df, ACTIVITY_KEY)
+            self._summary = completion_counts(activities_df)
+            self.source_token = source_token
+            self.data_version = get_data_version(master_df, activities_df)
+            if state is None:
+                self._master_fp = self._activities_fp = self._columns = None
+            else:
+                self._master_fp, self._activities_fp = state['master_fp'], state['activities_fp']
+                self._columns = state['columns']
+                self.memory_report = state['memory_report']
+            self.last_stats = {'mode': 'restore', 'master_rows': len(master_df), 'activity_rows': len(activities_df)}
+
+    def apply(self, master_raw, activities_raw, source_token=None):
+        """새 원본 데이터를 반영한 (master_df, activities_df)를 반환합니다."""
+        with self._lock:
+            self.source_token = source_token
+            columns = (tuple(master_raw.columns), tuple(activities_raw.columns))
+            can_patch = (
+                self._master_fp is not None
+                and columns == self._columns
+                and _has_valid_key(master_raw, MASTER_KEY)
+                and _has_valid_key(activities_raw, ACTIVITY_KEY)
+            )
+            if can_patch:
+                master_df, activities_df = self._patch(master_raw, activities_raw)
+            else:
+                master_df, activities_df = self._rebuild(master_raw, activities_raw)
+            self._columns = columns
+            master_df, activities_df = master_df.reset_index(drop=True), activities_df.reset_index(drop=True)
+            # 이전 프레임에서 물려받은 attrs가 아니라 항상 내용으로 버전을 계산합니다 (삭제만 있는 증분도 버전이 바뀌어야 함).
+            self.data_version = dataset_version(master_df, activities_df)
+            master_df.attrs[DATA_VERSION_ATTR] = activities_df.attrs[DATA_VERSION_ATTR] = self.data_version
+            return master_df, activities_df
+
+    def _rebuild(self, master_raw, activities_raw):
+        counts = {}
+        master_df, activities_df = compute_derived(master_raw, activities_raw, counts)
+        self.memory_report = {
+            'master': memory_report(master_raw, master_df),
+            'activities': memory_report(activities_raw, activities_df),
+        }
+        if _has_valid_key(master_raw, MASTER_KEY) and _has_valid_key(activities_raw, ACTIVITY_KEY):
+            self._master = _keyed(master_df, MASTER_KEY)
+            self._activities = _keyed(activities_df, ACTIVITY_KEY)
+            self._master_fp = _fingerprint(master_raw, MASTER_KEY)
+            self._activities_fp = _fingerprint(activities_raw, ACTIVITY_KEY)
+            self._summary = counts['summary']
+        else:
+            self._master = self._activities = self._master_fp = self._activities_fp = self._summary = None
+        self.last_stats = {'mode': 'full', 'master_rows': len(master_df), 'activity_rows': len(activities_df)}
+        return master_df, activities_df
+
+    def _patch(self, master_raw, activities_raw):
+        master_fp = _fingerprint(master_raw, MASTER_KEY)
+        activities_fp = _fingerprint(activities_raw, ACTIVITY_KEY)
+        m_added, m_changed, m_deleted = _diff(self._master_fp, master_fp)
+        a_added, a_changed, a_deleted = _diff(self._activities_fp, activities_fp)
+
+        # --- Activities: 변경/추가 행만 다시 변환 ---
+        old_activities = self._activities
+        a_upsert = a_added.append(a_changed)
+        activities_raw = _keyed(activities_raw, ACTIVITY_KEY)
+        unchanged = old_activities.drop(index=a_changed.append(a_deleted))
+        if len(a_upsert):
+            unchanged = concat_frames([unchanged, prepare_activities(activities_raw.loc[a_upsert], like=old_activities)], ACTIVITIES_SCHEMA)
+        activities_df = unchanged.loc[activities_fp.index]
+
+        # --- Kol_ID별 카운터 갱신: 이전 행(변경/삭제)은 빼고 새 행(추가/변경)은 더합니다 ---
+        summary, counted = update_counts(
+            self._summary,
+            old_activities.loc[a_changed.append(a_deleted), ['Activity_ID', 'Kol_ID', 'Status']],
+            activities_df.loc[a_upsert, ['Activity_ID', 'Kol_ID', 'Status']],
+        )
+        touched = counted.append(m_added).append(m_changed).unique()
+
+        # --- KOL_Master: 변경/추가 행만 다시 변환, 영향받은 KOL만 완료율 재계산 ---
+        m_upsert = m_added.append(m_changed)
+        master_raw = _keyed(master_raw, MASTER_KEY)
+        unchanged = self._master.drop(index=m_changed.append(m_deleted))
+        if len(m_upsert):
+            unchanged = concat_frames([unchanged, prepare_master(master_raw.loc[m_upsert], like=self._master)], MASTER_SCHEMA)
+        master_df = unchanged.loc[master_fp.index]
+
+        touched = touched.intersection(master_df.index)
+        rates = rates_from_counts(summary.reindex(touched))
+        master_df.loc[touched, 'Completion_Rate'] = rates.fillna(0).to_numpy()
+
+        self._master, self._activities, self._summary = master_df, activities_df, summary
+        self._master_fp, self._activities_fp = master_fp, activities_fp
+        self.last_stats = {
+            'mode': 'delta',
+            'master_added': len(m_added), 'master_changed': len(m_changed), 'master_deleted': len(m_deleted),
+            'activities_added': len(a_added), 'activities_changed': len(a_changed), 'activities_deleted': len(a_deleted),
+            'kols_recomputed': len(touched),
+        }
+        return master_df, activities_df
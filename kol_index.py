@@ -0,0 +1,34 @@
+import numpy as np
+
+# -----------------------------------------------------------------
+# KOL 상세 조회용 인덱스
+#   데이터 버전마다 한 번 만들어 두고, 사이드바에서 KOL을 바꿀 때는
+#   전체 테이블을 다시 훑지 않고 dict 조회 + 위치(iloc) 슬라이스만 합니다.
+# -----------------------------------------------------------------
+
+_NO_ROWS = np.array([], dtype=np.intp)
+
+
+class KolIndex:
+    """Name → Kol_ID, Kol_ID → KOL_Master 행 위치, Kol_ID → Activities 행 위치."""
+
+    def __init__(self, master_df, activities_df):
+        self._master = master_df
+        self._activities = activities_df
+        # 이름이 중복되면 시트에서 먼저 나온 행을 사용합니다 (기존 .iloc[0]과 동일).
+        first = ~master_df['Name'].duplicated()
+        self.name_to_id = dict(zip(master_df['Name'][first], master_df['Kol_ID'][first]))
+        self._master_rows = master_df.groupby('Kol_ID', sort=False).indices
+        self._activity_rows = activities_df.groupby('Kol_ID', sort=False).indices
+
+    def kol_id(self, name):
+        """이름에 해당하는 Kol_ID. 없으면 KeyError."""
+        return self.name_to_id[name]
+
+    def master_rows(self, kol_id):
+        """Kol_ID의 KOL_Master 행 (원래 행 순서/인덱스 유지)."""
+        return self._master.iloc[self._master_rows.get(kol_id, _NO_ROWS)]
+
+    def activities(self, kol_id):
+        """Kol_ID에 배정된 Activities 행 (없으면 빈 DataFrame)."""
+        return self._activities.iloc[self._activity_rows.get(kol_id, _NO_ROWS)]
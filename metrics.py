@@ -0,0 +1,30 @@
+# -----------------------------------------------------------------
+# 파생 지표 계산 (app.py, alert.py, kol_data.py 공용)
+#   모든 함수는 컬럼(Series) 단위 연산만 사용합니다 (apply / iterrows 없음).
+#   날짜 기준 일수(D-day, 지연 일수)는 알림 규칙과 같은 기준을 쓰도록 alert_rules.day_offsets에서 계산합니다.
+# -----------------------------------------------------------------
+DONE_STATUS = 'Done'
+UTILIZATION_CAP = 100
+
+
+def done_flag(status):
+    """Status가 'Done'이면 1, 아니면 0 (int8)."""
+    return (status == DONE_STATUS).astype('int8')
+
+
+def utilization_rate(spent, budget):
+    """예산 활용률(%). 예산이 0이거나 비어 있으면 0, 최대 UTILIZATION_CAP(100)."""
+    return ((spent / budget) * 100).fillna(0).clip(upper=UTILIZATION_CAP)
+
+
+def completion_counts(activities_df):
+    """Kol_ID별 활동 수(Total)와 완료 수(Done) 카운터 (int64)."""
+    if 'Done' not in activities_df.columns:
+        activities_df = activities_df.assign(Done=done_flag(activities_df['Status']))
+    summary = activities_df.groupby('Kol_ID').agg(Total=('Activity_ID', 'count'), Done=('Done', 'sum'))
+    return summary.astype('int64')
+
+
+def rates_from_counts(counts):
+    """completion_counts() 결과로 Kol_ID별 완료율(%)을 계산합니다."""
+    return (counts['Done'] / counts['Total']) * 100
@@ -0,0 +1,233 @@
+import logging
+import os
+import smtplib
+import string
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from email.message import EmailMessage
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+
+from schema import DATE_FORMAT
+
+# -----------------------------------------------------------------
+# 알림 발송 파이프라인 (alert.py)
+#   1) 알림 규칙(alert_rules.py)별 결과 프레임에서 메시지 줄을 컬럼 연산으로 만들고 (render_messages, render_lines)
+#   2) 받는 사람별로 한 통의 요약(digest)으로 묶은 뒤 (build_digests)
+#   3) 연결을 재사용하는 발송기로 동시 발송 수를 제한해 보냅니다 (SmtpSender / WebhookSender).
+#   발송 채널과 대상은 환경 변수로 설정하며, 호스트/URL만 바꾸면 로컬 테스트 서버로 보낼 수 있습니다.
+# -----------------------------------------------------------------
+ALERT_CHANNEL = os.environ.get('KOL_ALERT_CHANNEL', 'print')  # print | smtp | webhook
+ALERT_TO = [addr.strip() for addr in os.environ.get('KOL_ALERT_TO', '').split(',') if addr.strip()]
+RECIPIENT_COLUMN = os.environ.get('KOL_ALERT_RECIPIENT_COLUMN', '')  # KOL_Master의 담당자 컬럼 (없으면 ALERT_TO)
+SEND_CONCURRENCY = int(os.environ.get('KOL_ALERT_CONCURRENCY', 4))  # 동시에 열어 둘 SMTP 연결 / HTTP 요청 수
+SEND_TIMEOUT = float(os.environ.get('KOL_ALERT_TIMEOUT', 10))
+
+SMTP_HOST = os.environ.get('KOL_SMTP_HOST', 'localhost')
+SMTP_PORT = int(os.environ.get('KOL_SMTP_PORT', 25))
+SMTP_USER = os.environ.get('KOL_SMTP_USER', '')
+SMTP_PASSWORD = os.environ.get('KOL_SMTP_PASSWORD', '')
+SMTP_STARTTLS = os.environ.get('KOL_SMTP_STARTTLS', '0') == '1'
+ALERT_FROM = os.environ.get('KOL_ALERT_FROM', 'kol-alert@localhost')
+WEBHOOK_URL = os.environ.get('KOL_ALERT_WEBHOOK_URL', '')
+
+LINE_COLUMNS = ['Section', 'Name', 'Line']
+
+logger = logging.getLogger(__name__)
+
+
+# -----------------------------------------------------------------
+# 1. 메시지 렌더링 / 받는 사람별 요약
+# -----------------------------------------------------------------
+
+def text(series):
+    """메시지 조립용 문자열 컬럼 (빈 값은 f-string과 같이 'nan'). 빈 프레임에서도 더할 수 있게 object dtype으로 돌려줍니다."""
+    return series.astype(str).fillna('nan').astype(object)
+
+
+def render_messages(frame, template):
+    """
+    template(예: "[D-{D-Day}] {Name}")의 {컬럼}을 frame의 컬럼 값으로 채운 메시지 줄 Series.
+    행 단위 format 대신 컬럼 단위 문자열 연결로 만들며, 날짜 컬럼은 DATE_FORMAT으로 씁니다.
+    """
+    lines = pd.Series('', index=frame.index, dtype=object)
+    for literal, field, _, _ in string.Formatter().parse(template):
+        lines = lines + literal
+        if field is None:
+            continue
+        column = frame[field]
+        if pd.api.types.is_datetime64_any_dtype(column):
+            lines = lines + text(column.dt.strftime(DATE_FORMAT))
+        else:
+            lines = lines + text(column)
+    return lines
+
+
+def render_lines(section, frame, lines):
+    """알림 조건 하나의 결과를 [Section, Name, Line] 프레임으로 만듭니다. lines는 frame과 같은 행의 메시지 줄입니다."""
+    return pd.DataFrame({
+        'Section': section,
+        'Name': text(frame['Name']).to_numpy(),
+        'Line': lines.to_numpy(dtype=object),
+    }, columns=LINE_COLUMNS)
+
+
+def recipients_by_name(master_df, column=RECIPIENT_COLUMN):
+    """KOL 이름 → 담당자 주소. column이 없거나 비어 있으면 빈 Series."""
+    if not column or column not in master_df.columns:
+        return pd.Series(dtype=object)
+    recipients = master_df[['Name', column]].dropna().drop_duplicates('Name')
+    return pd.Series(recipients[column].astype(str).str.strip().to_numpy(), index=recipients['Name'].astype(str))
+
+
+def build_digests(alert_lines, recipients=None, default_to=ALERT_TO):
+    """
+    [Section, Name, Line] 알림 줄을 받는 사람별 요약 [Recipient, Count, Body]로 묶습니다.
+    담당자(recipients: 이름 → 주소)가 없는 알림은 default_to의 모든 주소로 보냅니다.
+    요약 안에서는 조건(Section) 순서와 조건별 줄 순서를 유지합니다.
+    """
+    if alert_lines.empty:
+        return pd.DataFrame(columns=['Recipient', 'Count', 'Body'])
+    lines = alert_lines.assign(Order=range(len(alert_lines)))
+    assigned = lines['Name'].map(recipients) if recipients is not None and len(recipients) else pd.Series(pd.NA, index=lines.index)
+    lines['Recipient'] = assigned.where(assigned.notna(), pd.Series([list(default_to)] * len(lines), index=lines.index))
+    lines = lines.explode('Recipient').dropna(subset=['Recipient']).sort_values(['Recipient', 'Order'], kind='stable')
+
+    sections = lines.groupby(['Recipient', 'Section'], sort=False).agg(
+        Order=('Order', 'first'), Count=('Line', 'size'), Lines=('Line', '\n'.join),
+    ).reset_index().sort_values(['Recipient', 'Order'], kind='stable')
+    sections['Block'] = sections['Section'] + '\n' + sections['Lines']
+    digests = sections.groupby('Recipient', sort=True).agg(Count=('Count', 'sum'), Body=('Block', '\n\n'.join))
+    return digests.reset_index()
+
+
+# -----------------------------------------------------------------
+# 2. 발송기: 연결을 재사용하고 동시 발송 수를 제한합니다
+# -----------------------------------------------------------------
+
+class _Sender:
+    """digests의 각 행을 스레드 풀(최대 concurrency개)에서 _send로 보내고 결과를 집계합니다."""
+
+    def __init__(self, concurrency=SEND_CONCURRENCY):
+        self.concurrency = max(1, concurrency)
+
+    def _send(self, recipient, subject, body):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def send_all(self, digests, subject):
+        """받는 사람별 요약을 보내고 {'sent', 'failed', 'errors'}를 반환합니다. 한 건이 실패해도 나머지는 계속 보냅니다."""
+        stats = {'sent': 0, 'failed': 0, 'errors': []}
+
+        def send_one(recipient, body):
+            try:
+                self._send(recipient, subject, body)
+                return recipient, None
+            except Exception as e:
+                logger.warning("알림 발송 실패 (%s): %s", recipient, e)
+                return recipient, e
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='alert-send') as pool:
+                for recipient, error in pool.map(send_one, digests['Recipient'], digests['Body']):
+                    if error is None:
+                        stats['sent'] += 1
+                    else:
+                        stats['failed'] += 1
+                        stats['errors'].append((recipient, str(error)))
+        finally:
+            self.close()
+        return stats
+
+
+class SmtpSender(_Sender):
+    """
+    스레드마다 SMTP 연결 하나를 열어 두고 여러 메일을 보냅니다 (연결/인증은 스레드당 한 번).
+    서버가 연결을 끊으면 한 번 다시 연결해서 보냅니다.
+    """
+
+    def __init__(self, host=SMTP_HOST, port=SMTP_PORT, user=SMTP_USER, password=SMTP_PASSWORD,
+                 starttls=SMTP_STARTTLS, sender=ALERT_FROM, concurrency=SEND_CONCURRENCY, timeout=SEND_TIMEOUT):
+        super().__init__(concurrency)
+        self.host, self.port, self.user, self.password = host, port, user, password
+        self.starttls, self.sender, self.timeout = starttls, sender, timeout
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []
+        self.connections_opened = 0
+
+    def _connect(self):
+        conn = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.starttls:
+            conn.starttls()
+        if self.user:
+            conn.login(self.user, self.password)
+        with self._lock:
+            self._connections.append(conn)
+            self.connections_opened += 1
+        return conn
+
+    def _connection(self, reconnect=False):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or reconnect:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    def _send(self, recipient, subject, body):
+        message = EmailMessage()
+        message['From'], message['To'], message['Subject'] = self.sender, recipient, subject
+        message.set_content(body)
+        try:
+            self._connection().send_message(message)
+        except smtplib.SMTPServerDisconnected:
+            self._connection(reconnect=True).send_message(message)
+
+    def close(self):
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.quit()
+            except (smtplib.SMTPException, OSError):
+                conn.close()
+        self._local = threading.local()
+
+
+class WebhookSender(_Sender):
+    """
+    하나의 requests.Session(keep-alive 연결 풀, 크기 = concurrency)으로 웹훅(예: Slack Incoming Webhook)에 보냅니다.
+    본문은 {"text": ...} JSON이며 첫 줄에 받는 사람을 적습니다.
+    """
+
+    def __init__(self, url=WEBHOOK_URL, concurrency=SEND_CONCURRENCY, timeout=SEND_TIMEOUT):
+        super().__init__(concurrency)
+        if not url:
+            raise ValueError("KOL_ALERT_WEBHOOK_URL이 필요합니다.")
+        self.url, self.timeout = url, timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.concurrency)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def _send(self, recipient, subject, body):
+        response = self.session.post(self.url, json={'text': f"{subject} → {recipient}\n{body}"}, timeout=self.timeout)
+        response.raise_for_status()
+
+    def close(self):
+        self.session.close()
+
+
+SENDERS = {'smtp': SmtpSender, 'webhook': WebhookSender}
+
+
+def make_sender(channel=ALERT_CHANNEL):
+    """채널에 맞는 발송기. 'print'(기본값)이면 None (발송하지 않고 출력만 합니다)."""
+    if channel == 'print':
+        return None
+    if channel not in SENDERS:
+        raise ValueError(f"알 수 없는 알림 채널: {channel} (print, smtp 또는 webhook)")
+    return SENDERS[channel]()
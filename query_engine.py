@@ -0,0 +1,140 @@
+import functools
+import os
+import threading
+
+import pyarrow as pa
+
+import aggregates
+from activity_cube import ActivityCube
+from time_buckets import DEFAULT_GRANULARITY, label_buckets
+
+try:
+    import duckdb
+except ImportError:  # 선택 의존성: KOL_QUERY_ENGINE=duckdb 일 때만 필요합니다.
+    duckdb = None
+
+# -----------------------------------------------------------------
+# 집계 조회 엔진
+#   pandas (기본값) : aggregates.py의 pandas 구현
+#   duckdb          : master_df / activities_df를 복사 없이 DuckDB 테이블로 등록하고 SQL로 조회 (멀티스레드)
+#   KOL_QUERY_ENGINE 환경 변수로 선택합니다. 두 엔진은 같은 컬럼 구성의 결과를 돌려줍니다.
+#   KOL별 상세 패널은 엔진과 관계없이 엔진이 들고 있는 활동 큐브(activity_cube.py)로 답합니다.
+#   알림은 엔진이 아니라 alert_rules.py의 규칙 엔진이 계산합니다.
+# -----------------------------------------------------------------
+QUERY_ENGINE = os.environ.get('KOL_QUERY_ENGINE', 'pandas')
+
+
+class PandasEngine:
+    name = 'pandas'
+
+    def __init__(self, master_df, activities_df):
+        self.master_df = master_df
+        self.activities_df = activities_df
+
+    @functools.cached_property
+    def cube(self):
+        return ActivityCube(self.activities_df)
+
+    def overview_aggregates(self, granularity=DEFAULT_GRANULARITY):
+        return aggregates.overview_aggregates(self.master_df, self.activities_df, granularity, cube=self.cube)
+
+
+_COUNTS_SQL = """
+    SELECT CAST({col} AS VARCHAR) AS "{label}", count(*) AS "Count"
+    FROM {table} WHERE {col} IS NOT NULL
+    GROUP BY 1 ORDER BY 2 DESC, 1
+"""
+
+_OVERVIEW_SQL = {
+    'status_counts': _COUNTS_SQL.format(col='Status', label='Status', table='activities'),
+    'kol_type_counts': _COUNTS_SQL.format(col='KOL_Type', label='Type', table='master'),
+    'activity_type_counts': _COUNTS_SQL.format(col='Activity_Type', label='Type', table='activities'),
+    'country_summary': """
+        SELECT CAST(Country AS VARCHAR) AS Country, sum("Budget (USD)") AS Total_Budget
+        FROM master WHERE Country IS NOT NULL GROUP BY 1 ORDER BY 1
+    """,
+    'top_kols': """
+        SELECT Name, Completion_Rate FROM master WHERE Completion_Rate IS NOT NULL
+        ORDER BY Completion_Rate DESC, Sheet_Row LIMIT 10
+    """,
+}
+
+# 기간 단위별 정수 버킷 키 (time_buckets.bucket_keys와 같은 계산). 라벨은 결과 버킷에 대해서만 만듭니다.
+_BUCKET_SQL = {
+    'day': 'Due_Day',
+    'week': 'CAST(floor((Due_Day + 3) / 7) AS BIGINT)',
+    'month': 'Due_Month',
+    'quarter': 'CAST(floor(Due_Month / 3) AS BIGINT)',
+}
+
+_TIMELINE_SQL = """
+    SELECT {bucket} AS Bucket, count(*) AS "{count_name}" FROM activities
+    WHERE Due_Day IS NOT NULL {condition} GROUP BY 1 ORDER BY 1
+"""
+
+_KPI_SQL = """
+    SELECT count(*), coalesce(sum("Budget (USD)"), 0), avg(Completion_Rate), coalesce(sum("Spent (USD)"), 0)
+    FROM master
+"""
+
+class DuckDBEngine:
+    """
+    프로세스 내 DuckDB 연결에 두 프레임을 'master', 'activities' 테이블로 등록합니다 (복사 없이 Arrow 버퍼를 그대로 스캔).
+    연결 하나를 여러 세션이 공유하므로 쿼리는 잠금 안에서 실행합니다 (쿼리 자체는 DuckDB가 멀티스레드로 처리).
+    """
+
+    name = 'duckdb'
+
+    def __init__(self, master_df, activities_df):
+        if duckdb is None:
+            raise RuntimeError("KOL_QUERY_ENGINE=duckdb 를 사용하려면 'pip install duckdb'가 필요합니다.")
+        self._lock = threading.Lock()
+        self._conn = duckdb.connect()
+        # pandas 프레임을 직접 스캔하는 것보다 Arrow 스캔이 빠르므로 Arrow 테이블로 등록합니다.
+        # (숫자/날짜/Arrow 문자열 컬럼은 버퍼를 그대로 공유하고, category는 dictionary 배열이 됩니다)
+        # master에는 원래 행 순서(Sheet_Row)를 붙여 둡니다. 동률 정렬을 pandas의 nlargest(keep='first')와 맞추는 데 씁니다.
+        master = pa.Table.from_pandas(master_df, preserve_index=False)
+        self._conn.register('master', master.append_column('Sheet_Row', pa.array(range(len(master_df)), pa.int64())))
+        self._conn.register('activities', pa.Table.from_pandas(activities_df, preserve_index=False))
+        self._activities_df = activities_df
+
+    @functools.cached_property
+    def cube(self):
+        return ActivityCube(self._activities_df)
+
+    def query(self, sql, params=None):
+        """SQL 결과를 DataFrame으로 반환합니다."""
+        with self._lock:
+            return self._conn.execute(sql, params or {}).to_arrow_table().to_pandas()
+
+    def _timeline(self, granularity, count_name, condition=''):
+        sql = _TIMELINE_SQL.format(bucket=_BUCKET_SQL[granularity], count_name=count_name, condition=condition)
+        return label_buckets(self.query(sql), granularity)
+
+    def overview_aggregates(self, granularity=DEFAULT_GRANULARITY):
+        with self._lock:
+            kol_count, total_budget, avg_completion, total_spent = self._conn.execute(_KPI_SQL).fetchone()
+        result = {name: self.query(sql) for name, sql in _OVERVIEW_SQL.items()}
+        result['timeline'] = self._timeline(granularity, 'Count')
+        result['completed_timeline'] = self._timeline(granularity, 'Completed', "AND CAST(Status AS VARCHAR) = 'Done'")
+        result['kpi'] = {
+            'kol_count': kol_count,
+            'total_budget': float(total_budget),
+            'avg_completion': float('nan') if avg_completion is None else float(avg_completion),
+            'avg_utilization': float((total_spent / total_budget) * 100) if total_budget > 0 else 0,
+        }
+        return result
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+ENGINES = {PandasEngine.name: PandasEngine, DuckDBEngine.name: DuckDBEngine}
+
+
+def make_engine(master_df, activities_df, kind=QUERY_ENGINE):
+    """kind('pandas' 또는 'duckdb') 엔진을 만듭니다."""
+    if kind not in ENGINES:
+        raise ValueError(f"알 수 없는 조회 엔진: {kind} (pandas 또는 duckdb)")
+    return ENGINES[kind](master_df, activities_df)
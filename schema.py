@@ -0,0 +1,167 @@
+import numpy as np
+import pandas as pd
+from pandas.api.types import infer_dtype, union_categoricals
+
+# -----------------------------------------------------------------
+# 시트별 컬럼 스키마
+#   id       : 정수 ID (빈 값이 없으면 int32, 있으면 nullable Int32. int32 범위를 넘으면 int64/Int64,
+#              숫자가 아니거나 정수가 아닌 값이 있으면 그대로)
+#   category : 반복되는 코드성 문자열 (category dtype)
+#   date     : 명시한 format으로 파싱 (format과 다른 값만 자동 추론으로 재시도)
+#   money    : 금액 (float64, 빈 값은 0 — 달러 단위 합계가 정확하도록 float32를 쓰지 않습니다)
+# 스키마에 없는 컬럼은 시트에서 읽은 그대로 둡니다.
+# -----------------------------------------------------------------
+DATE_FORMAT = '%Y-%m-%d'
+
+# 압축 표현 모드(compact_text)에서 고유값 비율이 이 값 이하인 문자열 컬럼은 category로 저장합니다.
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
+ARROW_STRING = pd.StringDtype('pyarrow', na_value=float('nan'))
+
+MASTER_SCHEMA = {
+    'Kol_ID': {'type': 'id'},
+    'Country': {'type': 'category'},
+    'KOL_Type': {'type': 'category'},
+    'Status': {'type': 'category'},
+    'Contract_End': {'type': 'date', 'format': DATE_FORMAT},
+    'Budget (USD)': {'type': 'money'},
+    'Spent (USD)': {'type': 'money'},
+}
+
+ACTIVITIES_SCHEMA = {
+    'Activity_ID': {'type': 'id'},
+    'Kol_ID': {'type': 'id'},
+    'Activity_Type': {'type': 'category'},
+    'Status': {'type': 'category'},
+    'Due_Date': {'type': 'date', 'format': DATE_FORMAT},
+}
+
+
+def _parse_id(series):
+    numeric = pd.to_numeric(series, errors='coerce')
+    if (numeric.isna() & series.notna()).any():
+        return series  # 숫자가 아닌 ID(예: 'K001')는 그대로 둡니다.
+    values = numeric.dropna().to_numpy(dtype=np.float64)
+    if not np.array_equal(values, np.trunc(values)) or (np.abs(values) >= 2 ** 63).any():
+        return series  # 정수가 아니거나 int64를 넘는 ID는 자르거나 감싸지 않고 그대로 둡니다.
+    int32 = np.iinfo(np.int32)
+    dtype = 'int32' if ((values >= int32.min) & (values <= int32.max)).all() else 'int64'
+    if numeric.isna().any():
+        return numeric.astype(dtype.capitalize())
+    return numeric.astype(dtype)
+
+
+def _parse_date(series, date_format):
+    parsed = pd.to_datetime(series, format=date_format, errors='coerce')
+    # 형식이 다른 값(예: 시트 지역 설정에 따른 표기)만 골라서 자동 추론으로 다시 파싱합니다.
+    retry = parsed.isna() & series.notna() & (series.astype(str).str.strip() != '')
+    if retry.any():
+        parsed[retry] = pd.to_datetime(series[retry], format='mixed', errors='coerce')
+    return parsed
+
+
+def _parse_money(series):
+    return pd.to_numeric(series, errors='coerce').fillna(0).astype('float64')
+
+
+def parse_frame(df, schema):
+    """스키마에 따라 컬럼 타입을 한 번에 변환한 새 DataFrame을 반환합니다."""
+    parsed = {}
+    for col, spec in schema.items():
+        if col not in df.columns:
+            continue
+        kind = spec['type']
+        if kind == 'id':
+            parsed[col] = _parse_id(df[col])
+        elif kind == 'category':
+            parsed[col] = df[col].astype('category')
+        elif kind == 'date':
+            parsed[col] = _parse_date(df[col], spec['format'])
+        elif kind == 'money':
+            parsed[col] = _parse_money(df[col])
+        else:
+            raise ValueError(f"알 수 없는 컬럼 타입: {col} ({kind})")
+    return df.assign(**parsed)
+
+
+def compact_text(df, schema):
+    """
+    스키마에 없는 문자열 컬럼을 압축 표현으로 바꾼 새 DataFrame을 반환합니다 (압축 표현 모드용).
+    반복이 많은 컬럼은 category, 나머지는 Arrow 문자열(행마다 파이썬 객체를 두지 않음)로 저장합니다.
+    """
+    compacted = {}
+    for col in df.columns:
+        if col in schema or isinstance(df[col].dtype, pd.CategoricalDtype):
+            continue
+        series = df[col]
+        if not (series.dtype == object or isinstance(series.dtype, pd.StringDtype)):
+            continue
+        if infer_dtype(series, skipna=True) not in ('string', 'empty'):
+            continue  # 숫자와 문자가 섞인 컬럼은 그대로 둡니다.
+        if len(series) and series.nunique() <= len(series) * CATEGORY_MAX_UNIQUE_RATIO:
+            compacted[col] = series.astype('category')
+        elif series.dtype != ARROW_STRING:
+            compacted[col] = series.astype(ARROW_STRING)
+    return df.assign(**compacted)
+
+
+def match_text_dtypes(df, like, schema):
+    """
+    스키마에 없는 컬럼 중 like(기존 프레임)에서 category / Arrow 문자열인 컬럼을 같은 표현으로 바꾼 새 DataFrame을 반환합니다.
+    증분 반영에서 바뀐 몇 행만 보고 compact_text가 표현을 다시 고르지 않도록 씁니다 (카테고리는 concat_frames에서 합칩니다).
+    """
+    matched = {}
+    for col in df.columns:
+        if col in schema or col not in like.columns or df[col].dtype == like[col].dtype:
+            continue
+        if isinstance(like[col].dtype, pd.CategoricalDtype):
+            matched[col] = df[col].astype('category')
+        elif like[col].dtype == ARROW_STRING:
+            matched[col] = df[col].astype(ARROW_STRING)
+    return df.assign(**matched)
+
+
+def concat_frames(frames, schema):
+    """
+    스키마가 적용된 프레임들을 이어 붙입니다.
+    카테고리가 서로 다른 category 컬럼은 pd.concat이 object로 바꾸므로, 카테고리를 합쳐 다시 category로 만듭니다.
+    (스키마에 없어도 compact_text로 category가 된 컬럼은 같은 방식으로 합칩니다)
+    """
+    frames = [f for f in frames if len(f)] or frames[:1]
+    result = pd.concat(frames)
+    category_columns = set(col for col, spec in schema.items() if spec['type'] == 'category')
+    category_columns.update(
+        col for f in frames for col in f.columns if isinstance(f[col].dtype, pd.CategoricalDtype)
+    )
+    for col in category_columns:
+        if col not in result.columns:
+            continue
+        if not isinstance(result[col].dtype, pd.CategoricalDtype):
+            result[col] = union_categoricals([f[col].astype('category') for f in frames])
+        result[col] = result[col].cat.remove_unused_categories()
+    return result
+
+
+def memory_report(before_df, after_df):
+    """컬럼별 메모리 사용량(바이트)을 변환 전/후로 비교한 표를 반환합니다."""
+    before = before_df.memory_usage(index=False, deep=True)
+    after = after_df.memory_usage(index=False, deep=True)
+    columns = after_df.columns.union(before_df.columns, sort=False)
+    report = pd.DataFrame({'Before (bytes)': before, 'After (bytes)': after}).reindex(columns).fillna(0).astype('int64')
+    report.loc['(합계)'] = report.sum()
+    report['Dtype'] = [str(after_df[c].dtype) if c in after_df.columns else '' for c in report.index]
+    return report
+
+
+def frame_memory(frames):
+    """
+    {이름: DataFrame}의 컬럼별 메모리 사용량 표 [Frame, Column, Dtype, Bytes].
+    프레임마다 '(합계)' 행이 붙으며, 인덱스 메모리도 '(index)' 행으로 포함합니다.
+    """
+    rows = []
+    for name, df in frames.items():
+        usage = df.memory_usage(index=True, deep=True)
+        dtypes = df.dtypes.astype(str).to_dict()
+        for col, nbytes in usage.items():
+            rows.append((name, '(index)' if col == 'Index' else col, dtypes.get(col, str(df.index.dtype)), int(nbytes)))
+        rows.append((name, '(합계)', '', int(usage.sum())))
+    return pd.DataFrame(rows, columns=['Frame', 'Column', 'Dtype', 'Bytes'])
@@ -0,0 +1,123 @@
+import contextlib
+import os
+import random
+import threading
+import time
+from http import HTTPStatus
+
+from gspread.exceptions import APIError
+from gspread.http_client import HTTPClient
+from requests.exceptions import ConnectionError as RequestsConnectionError
+
+# --- 설정값 ---
+# Sheets API 읽기 한도 (서비스 계정 = 사용자 1명 기준 분당 60회). 프로젝트 한도에 맞게 조정합니다.
+READ_QUOTA_PER_MINUTE = int(os.environ.get('KOL_SHEETS_READ_QUOTA', 60))
+MAX_RETRIES = 5
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 32.0
+RETRY_STATUS_CODES = {HTTPStatus.TOO_MANY_REQUESTS, HTTPStatus.REQUEST_TIMEOUT}
+SHEETS_API_HOST = 'sheets.googleapis.com'
+
+
+class TokenBucket:
+    """분당 한도(capacity)를 초당 capacity/60 속도로 채우는 토큰 버킷. 스레드 안전합니다."""
+
+    def __init__(self, capacity_per_minute):
+        self.capacity = float(capacity_per_minute)
+        self.rate = self.capacity / 60.0
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """토큰 1개를 얻을 때까지 기다리고, 기다린 시간(초)을 반환합니다."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+# 프로세스 전체(모든 Streamlit 세션)가 공유하는 버킷
+READ_BUCKET = TokenBucket(READ_QUOTA_PER_MINUTE)
+
+
+# -----------------------------------------------------------------
+# 로드 단위 API 사용량 집계
+# -----------------------------------------------------------------
+_local = threading.local()
+_stats_lock = threading.Lock()
+LAST_LOAD_USAGE = {}
+
+
+def _usage():
+    return getattr(_local, 'usage', None)
+
+
+@contextlib.contextmanager
+def track_api_usage():
+    """with 블록 안에서(같은 스레드) 발생한 API 호출 수, 재시도 수, 대기 시간을 집계합니다."""
+    usage = {'calls': 0, 'retries': 0, 'throttle_wait': 0.0, 'backoff_wait': 0.0}
+    _local.usage = usage
+    try:
+        yield usage
+    finally:
+        _local.usage = None
+        with _stats_lock:
+            LAST_LOAD_USAGE.clear()
+            LAST_LOAD_USAGE.update(usage)
+
+
+def get_last_load_usage():
+    """마지막 로드의 API 사용량 사본을 반환합니다."""
+    with _stats_lock:
+        return dict(LAST_LOAD_USAGE)
+
+
+def backoff_delay(attempt):
+    """지수 백오프 + full jitter: 0 ~ min(최대, 기본 * 2^attempt) 사이의 임의 시간."""
+    return random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * (2 ** attempt)))
+
+
+def _is_retryable(error):
+    if isinstance(error, RequestsConnectionError):
+        return True
+    # error.code는 응답 본문(JSON)의 값이라, Google 프런트엔드의 HTML 502/503 응답에서는 -1입니다.
+    code = error.response.status_code
+    return code in RETRY_STATUS_CODES or code >= HTTPStatus.INTERNAL_SERVER_ERROR
+
+
+class QuotaHTTPClient(HTTPClient):
+    """
+    gspread HTTP 클라이언트: Sheets API 호출 전에 공유 토큰 버킷에서 토큰을 얻고,
+    429/408/5xx 및 연결 오류는 jitter가 있는 지수 백오프로 최대 MAX_RETRIES번 재시도합니다.
+    """
+
+    def request(self, method, endpoint, *args, **kwargs):
+        usage = _usage()
+        attempt = 0
+        while True:
+            if SHEETS_API_HOST in endpoint:
+                waited = READ_BUCKET.acquire()
+                if usage is not None:
+                    usage['throttle_wait'] += waited
+            if usage is not None:
+                usage['calls'] += 1
+            try:
+                return super().request(method, endpoint, *args, **kwargs)
+            except (APIError, RequestsConnectionError) as e:
+                if attempt >= MAX_RETRIES or not _is_retryable(e):
+                    raise
+                delay = backoff_delay(attempt)
+                attempt += 1
+                if usage is not None:
+                    usage['retries'] += 1
+                    usage['backoff_wait'] += delay
+                time.sleep(delay)
@@ -0,0 +1,59 @@
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    같은 key의 작업이 이미 실행 중이면 새로 실행하지 않고 그 결과를 함께 받습니다.
+    (캐시 만료 시점에 여러 세션이 동시에 같은 스프레드시트를 다시 읽는 것을 막습니다)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._stats = {'executed': 0, 'coalesced': 0}
+
+    def stats(self):
+        """실행 횟수(executed)와 다른 호출에 합류한 횟수(coalesced)를 반환합니다."""
+        with self._lock:
+            return dict(self._stats)
+
+    def do(self, key, fn, *args, **kwargs):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self._stats['executed'] += 1
+            else:
+                call.waiters += 1
+                self._stats['coalesced'] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+            if call.waiters:
+                logger.info("'%s' 로드에 동시 요청 %d건이 합류했습니다.", key, call.waiters)
@@ -0,0 +1,145 @@
+import json
+import logging
+import os
+import time
+
+import pandas as pd
+
+from kol_data import DATA_VERSION_ATTR, get_data_version
+
+# --- 설정값 ---
+# 스냅샷 저장 위치와 유효 시간(초). 환경 변수로 변경할 수 있습니다.
+SNAPSHOT_DIR = os.environ.get(
+    'KOL_SNAPSHOT_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.kol_snapshot'),
+)
+SNAPSHOT_MAX_AGE = float(os.environ.get('KOL_SNAPSHOT_MAX_AGE', 60))
+SNAPSHOT_FORMAT = 3  # 저장 형식이 바뀌면 올려서 이전 스냅샷을 무시합니다.
+
+META_FILE = 'snapshot.json'
+
+logger = logging.getLogger(__name__)
+
+
+def _replace_atomic(path, write):
+    """임시 파일에 쓴 뒤 rename 하여, 읽는 쪽이 반쯤 쓰인 파일을 보지 않도록 합니다."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _write_json(path, data):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+
+
+def _fingerprint_frame(fp):
+    return pd.DataFrame({'Key': fp.index.to_numpy(), 'Hash': fp.to_numpy()})
+
+
+def write_snapshot(master_df, activities_df, source_token=None, snapshot_dir=SNAPSHOT_DIR, sync_state=None):
+    """
+    계산이 끝난 master_df, activities_df를 Parquet 파일로 저장합니다.
+    source_token은 원본 시트의 변경 토큰(change_probe.probe_token)으로, 다음 로드 때 변경 여부 비교에 사용됩니다.
+    sync_state(DeltaSync.sync_state)를 넘기면 행 fingerprint도 함께 저장해, 재시작 후에도 다음 변경을 증분으로 반영합니다.
+    같은 버전이 이미 있으면 Parquet은 다시 쓰지 않고 메타데이터(저장 시각)만 갱신합니다.
+    메타데이터(snapshot.json)를 마지막에 교체하므로, 다른 프로세스는 항상 완성된 버전만 읽습니다.
+    저장에 실패해도 예외를 던지지 않고 None을 반환합니다 (스냅샷은 캐시일 뿐입니다).
+    """
+    try:
+        os.makedirs(snapshot_dir, exist_ok=True)
+        version = get_data_version(master_df, activities_df)
+        files = {'master': f"master-{version}.parquet", 'activities': f"activities-{version}.parquet"}
+
+        for name, df in (('master', master_df), ('activities', activities_df)):
+            path = os.path.join(snapshot_dir, files[name])
+            if not os.path.exists(path):
+                _replace_atomic(path, lambda p, df=df: df.to_parquet(p, index=False))
+
+        meta = {
+            'format': SNAPSHOT_FORMAT, 'version': version, 'written_at': time.time(),
+            'source_token': source_token, 'files': files,
+        }
+        if sync_state is not None:
+            meta['sync'] = _write_sync_state(sync_state, version, files, snapshot_dir)
+        _replace_atomic(os.path.join(snapshot_dir, META_FILE), lambda p: _write_json(p, meta))
+
+        # 이전 버전 파일 정리
+        for file_name in os.listdir(snapshot_dir):
+            if file_name.endswith('.parquet') and file_name not in files.values():
+                try:
+                    os.remove(os.path.join(snapshot_dir, file_name))
+                except OSError:
+                    pass
+        return meta
+
+    except Exception as e:
+        logger.warning("스냅샷 저장 실패: %s", e)
+        return None
+
+
+def _write_sync_state(sync_state, version, files, snapshot_dir):
+    """fingerprint를 Parquet으로 쓰고 files에 추가한 뒤, 메타데이터에 넣을 나머지 상태를 반환합니다. 실패하면 None."""
+    try:
+        fp_files = {}
+        for name in ('master', 'activities'):
+            fp_name = f"{name}_fp-{version}.parquet"
+            path = os.path.join(snapshot_dir, fp_name)
+            if not os.path.exists(path):
+                fp = _fingerprint_frame(sync_state[f'{name}_fp'])
+                _replace_atomic(path, lambda p, fp=fp: fp.to_parquet(p, index=False))
+            fp_files[f'{name}_fp'] = fp_name
+        report = sync_state['memory_report']
+        sync = {
+            'columns': [list(cols) for cols in sync_state['columns']],
+            'memory_report': {name: df.to_dict(orient='split') for name, df in report.items()} if report else None,
+        }
+        files.update(fp_files)
+        return sync
+    except Exception as e:
+        logger.warning("증분 동기화 상태 저장 실패 (데이터 스냅샷만 저장합니다): %s", e)
+        return None
+
+
+def read_sync_state(meta, snapshot_dir=SNAPSHOT_DIR):
+    """read_snapshot의 meta에서 DeltaSync.restore에 넘길 상태를 읽습니다. 저장된 상태가 없거나 읽을 수 없으면 None."""
+    sync = meta.get('sync')
+    if not sync:
+        return None
+    try:
+        state = {'columns': tuple(tuple(cols) for cols in sync['columns'])}
+        for name in ('master_fp', 'activities_fp'):
+            fp = pd.read_parquet(os.path.join(snapshot_dir, meta['files'][name]))
+            state[name] = pd.Series(fp['Hash'].to_numpy(), index=pd.Index(fp['Key'].to_numpy()))
+        report = sync.get('memory_report')
+        state['memory_report'] = {name: pd.DataFrame(**split) for name, split in report.items()} if report else None
+        return state
+    except Exception as e:
+        logger.warning("증분 동기화 상태 읽기 실패: %s", e)
+        return None
+
+
+def read_snapshot(max_age=SNAPSHOT_MAX_AGE, snapshot_dir=SNAPSHOT_DIR):
+    """
+    저장된 스냅샷을 (master_df, activities_df, meta)로 반환합니다.
+    스냅샷이 없거나, 형식이 다르거나, max_age(초)보다 오래되었으면 None을 반환합니다.
+    max_age=None이면 나이와 관계없이 반환합니다.
+    """
+    try:
+        with open(os.path.join(snapshot_dir, META_FILE), encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta.get('format') != SNAPSHOT_FORMAT:
+            return None
+        if max_age is not None and time.time() - meta['written_at'] > max_age:
+            return None
+
+        master_df = pd.read_parquet(os.path.join(snapshot_dir, meta['files']['master']))
+        activities_df = pd.read_parquet(os.path.join(snapshot_dir, meta['files']['activities']))
+        master_df.attrs[DATA_VERSION_ATTR] = activities_df.attrs[DATA_VERSION_ATTR] = meta['version']
+        return master_df, activities_df, meta
+
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning("스냅샷 읽기 실패: %s", e)
+        return None
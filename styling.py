@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+
+from alert_rules import alert_mask
+
+# -----------------------------------------------------------------
+# 원본 데이터 표의 조건부 서식
+#   Styler.apply(..., axis=None)에 넘겨 표 전체의 스타일 프레임을 한 번에 만듭니다.
+#   강조 조건은 알림 규칙(alert_rules.py)과 같으며, 날짜 단위로 비교합니다 (기존 .date() 비교와 동일).
+#   KOL_Type별 알림 단계도 evaluate_rules와 같이 적용합니다 (alert_mask).
+# -----------------------------------------------------------------
+IMMINENT_CONTRACT_STYLE = 'background-color: #ffd70040'
+OVERDUE_ACTIVITY_STYLE = 'background-color: #ff4c4c40'
+
+
+def _row_styles(df, mask, style):
+    """mask가 True인 행의 모든 칸에 style을 적용한 스타일 프레임."""
+    column = np.where(np.asarray(mask, dtype=bool), style, '')
+    return pd.DataFrame(np.repeat(column[:, None], df.shape[1], axis=1), index=df.index, columns=df.columns)
+
+
+def highlight_master_rows(df, today):
+    """KOL_Master 테이블에서 계약 만료 임박 행(contract_expiry 규칙)을 강조합니다."""
+    return _row_styles(df, alert_mask(df, 'contract_expiry', today), IMMINENT_CONTRACT_STYLE)
+
+
+def highlight_activity_rows(df, today):
+    """Activities 테이블에서 지연된 활동 행(activity_overdue 규칙)을 강조합니다."""
+    return _row_styles(df, alert_mask(df, 'activity_overdue', today), OVERDUE_ACTIVITY_STYLE)
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+
+from schema import DATE_FORMAT
+
+# -----------------------------------------------------------------
+# 원본 데이터 표의 서버 측 필터 / 정렬 / 페이지 나누기
+#   전체 표는 행 위치(np.ndarray)만 계산하고, 화면에 보일 페이지만 잘라서
+#   서식을 적용하고 브라우저로 보냅니다.
+# -----------------------------------------------------------------
+
+def _as_text(series):
+    """필터 비교용 문자열 컬럼 (날짜는 표시 형식, category는 범주 단위로 한 번만 변환)."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.rename_categories(series.cat.categories.astype(str))
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series.dt.strftime(DATE_FORMAT)
+    return series.astype(str)
+
+
+def filter_positions(df, column=None, query=''):
+    """column 값에 query가 포함된(대소문자 무시) 행의 위치. 조건이 없으면 전체 행."""
+    if not column or not query:
+        return np.arange(len(df))
+    text = _as_text(df[column])
+    if isinstance(text.dtype, pd.CategoricalDtype):
+        hits = text.cat.categories.str.contains(query, case=False, regex=False)
+        mask = np.isin(text.cat.codes.to_numpy(), np.flatnonzero(hits))
+    else:
+        mask = text.str.contains(query, case=False, regex=False).fillna(False).to_numpy(dtype=bool)
+    return np.flatnonzero(mask)
+
+
+def sort_positions(df, positions, column=None, descending=False):
+    """positions를 column 기준으로 정렬합니다 (안정 정렬, 빈 값은 마지막). column이 없으면 원래 순서."""
+    if not column:
+        return positions
+    values = df[column].iloc[positions].reset_index(drop=True)
+    order = values.sort_values(ascending=not descending, kind='stable', na_position='last').index.to_numpy()
+    return positions[order]
+
+
+def table_positions(df, filter_column=None, query='', sort_column=None, descending=False):
+    """필터와 정렬을 적용한 행 위치."""
+    return sort_positions(df, filter_positions(df, filter_column, query), sort_column, descending)
+
+
+def page_count(total_rows, page_size):
+    return max(1, -(-total_rows // page_size))
+
+
+def page_rows(df, positions, page, page_size):
+    """1부터 시작하는 page 번호의 행만 잘라 반환합니다."""
+    start = (page - 1) * page_size
+    return df.iloc[positions[start:start + page_size]]
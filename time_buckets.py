@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+
+# -----------------------------------------------------------------
+# 날짜 키와 기간 단위(일/주/월/분기) 집계
+#   로드 시 Due_Date에서 정수 키 두 개를 한 번만 계산해 둡니다.
+#     Due_Day   : 1970-01-01 기준 일수
+#     Due_Month : 1970-01 기준 월 번호 (연 * 12 + 월 - 1970 * 12 - 1)
+#   기간 단위 집계는 이 키의 정수 연산으로 하고, 라벨 문자열은 실제로 있는 기간에 대해서만 만듭니다.
+# -----------------------------------------------------------------
+GRANULARITIES = {'day': '일', 'week': '주', 'month': '월', 'quarter': '분기'}
+DEFAULT_GRANULARITY = 'month'
+PERIOD_COLUMN = 'Period'
+
+_EPOCH_WEEKDAY_OFFSET = 3  # 1970-01-01은 목요일 → +3일 하면 월요일 시작 주 번호가 됩니다.
+
+
+def date_keys(dates):
+    """datetime 컬럼에서 (Due_Day, Due_Month) 정수 키를 계산합니다 (빈 날짜는 <NA>, Int32)."""
+    missing = dates.isna().to_numpy()
+    values = dates.to_numpy()
+    days = np.where(missing, 0, values.astype('datetime64[D]').astype(np.int64)).astype(np.int32)
+    months = np.where(missing, 0, values.astype('datetime64[M]').astype(np.int64)).astype(np.int32)
+    return (
+        pd.Series(pd.arrays.IntegerArray(days, missing), index=dates.index),
+        pd.Series(pd.arrays.IntegerArray(months, missing.copy()), index=dates.index),
+    )
+
+
+def bucket_keys(day_key, month_key, granularity):
+    """기간 단위별 정수 버킷 키 (빈 날짜는 <NA>)."""
+    if granularity == 'day':
+        return day_key
+    if granularity == 'week':
+        return (day_key + _EPOCH_WEEKDAY_OFFSET) // 7
+    if granularity == 'month':
+        return month_key
+    if granularity == 'quarter':
+        return month_key // 3
+    raise ValueError(f"알 수 없는 기간 단위: {granularity} ({', '.join(GRANULARITIES)})")
+
+
+def bucket_labels(keys, granularity):
+    """버킷 키 배열의 표시 라벨 (일/주: 'YYYY-MM-DD', 주는 그 주의 월요일 / 월: 'YYYY-MM' / 분기: 'YYYY-Qn')."""
+    keys = np.asarray(keys, dtype=np.int64)
+    if granularity in ('day', 'week'):
+        days = keys if granularity == 'day' else keys * 7 - _EPOCH_WEEKDAY_OFFSET
+        return np.datetime_as_string(days.astype('datetime64[D]'), unit='D')
+    if granularity == 'month':
+        return np.datetime_as_string(keys.astype('datetime64[M]'), unit='M')
+    year, quarter = np.divmod(keys, 4)
+    return np.char.add(np.char.add((year + 1970).astype(str), '-Q'), (quarter + 1).astype(str))
+
+
+def bucket_counts(activities_df, granularity, count_name='Count', mask=None):
+    """기간 버킷별 행 수: [Period, count_name] (기간 순 정렬, 날짜가 없는 행 제외)."""
+    keys = bucket_keys(activities_df['Due_Day'], activities_df['Due_Month'], granularity)
+    if mask is not None:
+        keys = keys[mask]
+    keys = keys.dropna().to_numpy(dtype=np.int64)
+    unique, counts = np.unique(keys, return_counts=True)
+    return pd.DataFrame({PERIOD_COLUMN: bucket_labels(unique, granularity), count_name: counts})
+
+
+def label_buckets(bucket_frame, granularity, key_column='Bucket'):
+    """정수 버킷 키 컬럼(key_column)을 라벨 컬럼(Period)으로 바꿉니다 (SQL 엔진 결과용)."""
+    labels = bucket_labels(bucket_frame[key_column].to_numpy(dtype=np.int64), granularity)
+    return bucket_frame.drop(columns=key_column).assign(**{PERIOD_COLUMN: labels})[
+        [PERIOD_COLUMN] + [c for c in bucket_frame.columns if c != key_column]
+    ]